@@ -0,0 +1,47 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from per_process import per_process
+
+
+@per_process
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the per-process background event loop, starting it on first use.
+
+    The loop runs forever in a daemon thread and is shared by every request of the
+    worker, so the async clients bound to it keep their connection pools across
+    requests and many requests can await network I/O at the same time. It is
+    restarted when the current PID differs from the one that started it, since
+    the loop thread does not survive a fork.
+
+    'asyncio.to_thread()' runs the blocking tool calls, fast path and cache lookups on
+    the loop's default executor, which is sized explicitly by 'AIO_THREADS' instead of
+    the CPU-based default, since those threads mostly wait on the network.
+
+    Returns:
+        asyncio.AbstractEventLoop: The running loop of this process.
+    """
+    loop = asyncio.new_event_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=int(os.environ.get('AIO_THREADS') or 32), thread_name_prefix='aio'))
+    threading.Thread(target=loop.run_forever, name='aio-loop', daemon=True).start()
+
+    return loop
+
+
+def run(coro, timeout: float = None):
+    """
+    Runs a coroutine on the background event loop and waits for its result.
+
+    Must not be called from the loop thread itself, e.g. from inside a coroutine.
+
+    Args:
+        coro: The coroutine to run.
+        timeout (float, optional): Seconds to wait before giving up.
+
+    Returns:
+        The result of the coroutine; its exceptions are raised in the caller.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result(timeout)
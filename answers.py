@@ -0,0 +1,133 @@
+from datetime import date
+from intent import MONTH_NAMES
+
+
+def format_date(value: str) -> str:
+    """
+    Formats a 'YYYY-MM-DD' date in Italian, e.g. '4 luglio 2024' or '1° agosto 2024'.
+    """
+    day = date.fromisoformat(value)
+    ordinal = '1°' if day.day == 1 else str(day.day)
+    return f'{ordinal} {MONTH_NAMES[day.month]} {day.year}'
+
+
+def format_range(from_date: str, to_date: str) -> str:
+    """
+    Formats a date range in Italian, e.g. 'dal 4 luglio 2024 al 10 luglio 2024' or 'il 4 luglio 2024'.
+    """
+    if from_date == to_date:
+        return f'il {format_date(from_date)}'
+
+    return f'dal {format_date(from_date)} al {format_date(to_date)}'
+
+
+def percentage(amount: int) -> str:
+    """
+    Returns 'al N%' with the right Italian articulated preposition, e.g. 'al 70%', 'all'80%'.
+    """
+    if amount in (1, 8, 11) or 80 <= amount <= 89:
+        return f"all'{amount}%"
+
+    return f'al {amount}%'
+
+
+def describe_target(kind: str, target: str) -> str:
+    """
+    Describes the group an availability question is about, in Italian.
+    """
+    if kind == 'practice':
+        return f'nella practice {target}'
+
+    return f'con il ruolo di {target}'
+
+
+def join_names(names: list) -> str:
+    """
+    Joins names the Italian way, e.g. 'A, B e C'.
+    """
+    if len(names) <= 1:
+        return ''.join(names)
+
+    return ', '.join(names[:-1]) + ' e ' + names[-1]
+
+
+def render_answer(intent, availabilities: list, top_n: int = 5) -> str:
+    """
+    Renders a natural language Italian answer from structured availability results.
+
+    Single employees get a one-line sentence. For a group, the fully free people are 
+    listed first, then up to 'top_n' partially free people by decreasing availability; 
+    the remaining ones are summarized with a count. Empty groups and groups where 
+    nobody is free get their own sentence.
+
+    Args:
+        intent (Intent): The question, i.e. the selector and the date range.
+        availabilities (list): The 'Availability' results for the question.
+        top_n (int): Maximum number of people listed by name in each group.
+
+    Returns:
+        str: The answer.
+    """
+    when = format_range(intent.from_date, intent.to_date)
+
+    if intent.kind == 'employee':
+        availability = availabilities[0]
+
+        if availability.amount_free <= 0:
+            return f'{availability.name} non è disponibile {when}.'
+
+        if availability.amount_free >= 100:
+            return f'{availability.name} è completamente disponibile {when}.'
+
+        return f'{availability.name} è disponibile {percentage(availability.amount_free)} {when}.'
+
+    target = describe_target(intent.kind, intent.target)
+
+    if not availabilities:
+        return f'Non ho trovato nessuno {target}.'
+
+    fully_free = [a.name for a in availabilities if a.amount_free >= 100]
+    partially_free = sorted((a for a in availabilities if 0 < a.amount_free < 100),
+                            key=lambda a: a.amount_free, reverse=True)
+
+    if not fully_free and not partially_free:
+        return f'Nessuno {target} è disponibile {when}.'
+
+    sentences = []
+
+    if fully_free:
+        names = fully_free[:top_n]
+        if len(fully_free) > top_n:
+            names.append(f'altre {len(fully_free) - top_n} persone')
+        if len(fully_free) == 1:
+            sentences.append(f'{when.capitalize()} {target} è completamente disponibile {names[0]}.')
+        else:
+            sentences.append(f'{when.capitalize()} {target} sono completamente disponibili: {join_names(names)}.')
+
+    if partially_free:
+        names = [f'{a.name} ({a.amount_free}%)' for a in partially_free[:top_n]]
+        if len(partially_free) > top_n:
+            names.append(f'altre {len(partially_free) - top_n} persone')
+        prefix = 'Parzialmente disponibili' if fully_free else f'{when.capitalize()} {target} sono parzialmente disponibili'
+        sentences.append(f'{prefix}: {join_names(names)}.')
+
+    busy = len(availabilities) - len(fully_free) - len(partially_free)
+    if busy:
+        sentences.append('Una persona è completamente occupata.' if busy == 1 else
+                         f'{busy} persone sono completamente occupate.')
+
+    return ' '.join(sentences)
+
+
+def render_answers(results: list, top_n: int = 5) -> str:
+    """
+    Renders the answer to a question that needed one or more availability lookups.
+
+    Args:
+        results (list): (intent, availabilities) pairs, in order.
+        top_n (int): Maximum number of people listed by name in each group.
+
+    Returns:
+        str: The answers of every lookup, joined.
+    """
+    return ' '.join(render_answer(intent, availabilities, top_n) for intent, availabilities in results)
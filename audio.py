@@ -1,23 +1,28 @@
+import asyncio
 import os
+import httpx
 import requests
 import uuid
 from pathlib import Path
+from per_process import per_process
 
-def elevenlalbs(text:str, folder_path:str) -> str:
-    id = str(uuid.uuid4())
-
-    Path(folder_path).mkdir(parents=True, exist_ok=True)
+MODEL = "eleven_multilingual_v2"
 
-    speech_file_path = f"{folder_path}/{id}.mp3"
 
-    VOICE_ID = os.environ.get('ELEVENLABS_VOICE_ID') or "gPWeWJBcOrH90ldfr24o"
-    MODEL = "eleven_multilingual_v2"
+def voice_id() -> str:
+    return os.environ.get('ELEVENLABS_VOICE_ID') or "gPWeWJBcOrH90ldfr24o"
 
-    CHUNK_SIZE = 1024
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
 
-    
+def tts_request(text: str, stream: bool = False) -> tuple:
+    """
+    Returns the (url, headers, body) of an ElevenLabs text-to-speech request.
 
+    With 'stream' the request targets the streaming endpoint, which starts sending 
+    audio before the whole text is synthesized.
+    """
+    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id()}"
+    if stream:
+        url += "/stream"
 
     headers = {
         "Accept": "audio/mpeg",
@@ -34,11 +39,138 @@ def elevenlalbs(text:str, folder_path:str) -> str:
         # }
     }
 
+    return url, headers, data
+
+
+def elevenlalbs(text:str, folder_path:str) -> str:
+    id = str(uuid.uuid4())
 
-    response = requests.post(url, json=data, headers=headers)
+    Path(folder_path).mkdir(parents=True, exist_ok=True)
+
+    speech_file_path = f"{folder_path}/{id}.mp3"
+
+    CHUNK_SIZE = 1024
+    url, headers, data = tts_request(text)
+
+    response = requests.post(url, json=data, headers=headers,
+                             timeout=(5, float(os.environ.get('ELEVENLABS_TIMEOUT') or 60)))
+    response.raise_for_status()
     with open(speech_file_path, 'wb') as f:
         for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
             if chunk:
                 f.write(chunk)
     
-    return speech_file_path
\ No newline at end of file
+    return speech_file_path
+
+
+def stream_tts(text: str, tee_path: str = None, on_complete=None):
+    """
+    Starts a streaming synthesis and returns an iterator over the MP3 chunks as they arrive.
+
+    The request is sent, and its status checked, before this function returns, so 
+    errors can still be reported with a proper HTTP status. With 'tee_path' the chunks 
+    are also written to disk; the file only appears once the stream is complete, a 
+    stream interrupted (e.g. by a client disconnecting) leaves nothing behind.
+
+    Args:
+        text (str): The text to synthesize.
+        tee_path (str, optional): Where to save a copy of the MP3.
+        on_complete (callable, optional): Called with 'tee_path' once the copy is saved.
+
+    Returns:
+        iterator: The MP3 chunks, in order.
+
+    Raises:
+        requests.exceptions.HTTPError: If ElevenLabs answers with an error status.
+    """
+    url, headers, data = tts_request(text, stream=True)
+
+    response = requests.post(url, json=data, headers=headers, stream=True,
+                             timeout=(5, float(os.environ.get('ELEVENLABS_TIMEOUT') or 60)))
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        response.close()
+        raise
+
+    return _iter_tts(response, tee_path, on_complete)
+
+
+def _iter_tts(response, tee_path: str = None, on_complete=None):
+    part_path = f"{tee_path}.{uuid.uuid4().hex}.part" if tee_path else None
+    f = None
+
+    try:
+        if part_path:
+            Path(part_path).parent.mkdir(parents=True, exist_ok=True)
+            f = open(part_path, 'wb')
+
+        for chunk in response.iter_content(chunk_size=4096):
+            if chunk:
+                if f:
+                    f.write(chunk)
+                yield chunk
+
+        if f:
+            f.close()
+            os.replace(part_path, tee_path)
+            f = None
+            if on_complete:
+                on_complete(tee_path)
+    finally:
+        response.close()
+        if f:
+            f.close()
+            os.remove(part_path)
+
+
+@per_process
+def get_async_tts_client() -> httpx.AsyncClient:
+    """
+    Returns the per-process async HTTP client for ElevenLabs, creating it on first use.
+
+    Like the async OpenAI client, it must only be awaited on the 'aio' event loop
+    and is rebuilt after a fork.
+    """
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(float(os.environ.get('ELEVENLABS_TIMEOUT') or 60), connect=5),
+        limits=httpx.Limits(max_connections=int(os.environ.get('ELEVENLABS_MAX_CONNECTIONS') or 20)),
+    )
+
+
+def _write(path: str, chunks: list):
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+async def elevenlabs_async(text: str, folder_path: str) -> str:
+    """
+    Async variant of 'elevenlalbs()': synthesizes 'text' and saves it as a new MP3 file.
+
+    The download is awaited on the event loop; only the final file write runs in a
+    worker thread.
+
+    Args:
+        text (str): The text to synthesize.
+        folder_path (str): The folder of the MP3 file, created if missing.
+
+    Returns:
+        str: The path of the MP3 file.
+
+    Raises:
+        httpx.HTTPStatusError: If ElevenLabs answers with an error status.
+    """
+    speech_file_path = f"{folder_path}/{uuid.uuid4()}.mp3"
+    url, headers, data = tts_request(text)
+
+    chunks = []
+    async with get_async_tts_client().stream('POST', url, json=data, headers=headers) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+
+    await asyncio.to_thread(Path(folder_path).mkdir, parents=True, exist_ok=True)
+    await asyncio.to_thread(_write, speech_file_path, chunks)
+
+    return speech_file_path
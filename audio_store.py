@@ -0,0 +1,212 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class AudioStore:
+    """
+    Bounded folder of MP3 files.
+
+    The files are tracked in an in-memory index ordered by last use, so the least
+    recently used file is always at the front and every add, use or eviction is
+    O(1). Files are deleted when the total size exceeds 'max_bytes' (oldest first)
+    or when they have not been used for 'max_age' seconds. A background sweeper
+    expires old files every 'sweep_interval' seconds and rescans the folder, adopting
+    files written by other worker processes and removing stale partial downloads,
+    including the files left in the '.tmp' scratch subfolder.
+    """
+
+    def __init__(self, folder: str, max_bytes: int, max_age: float, sweep_interval: float = 60):
+        """
+        Args:
+            folder (str): The folder holding the files, created if missing.
+            max_bytes (int): Maximum total size of the files.
+            max_age (float): Seconds after the last use when a file is deleted.
+            sweep_interval (float): Seconds between two sweeps.
+        """
+        self.folder = folder
+        # scratch space for downloads in progress, out of the index
+        self.tmp_folder = f'{folder}/.tmp'
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # name -> (size, last use)
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._sweeps = 0
+        self._sweeper_pid = None
+
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        self.scan()
+
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def path(self, name: str) -> str:
+        return f'{self.folder}/{name}'
+
+    def add(self, path: str):
+        """
+        Tracks a file written into the folder, evicting older files if over budget.
+        """
+        name = os.path.basename(path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            self._add(name, size, time.time())
+
+        self._start_sweeper()
+
+    def use(self, name: str) -> bool:
+        """
+        Marks a file as just used.
+
+        Files unknown to the index but present on disk (e.g. written by another
+        worker) are adopted.
+
+        Returns:
+            bool: Whether the file exists.
+        """
+        path = self.path(name)
+
+        with self._lock:
+            if name in self._index:
+                if os.path.isfile(path):
+                    size, _ = self._index.pop(name)
+                    self._index[name] = (size, time.time())
+                    return True
+                self._bytes -= self._index.pop(name)[0]
+
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+
+        with self._lock:
+            self._add(name, size, time.time())
+
+        self._start_sweeper()
+        return True
+
+    def sweep(self):
+        """
+        Deletes the files unused for more than 'max_age' seconds.
+        """
+        expired = []
+        deadline = time.time() - self.max_age
+
+        with self._lock:
+            while self._index:
+                name, (size, last_use) = next(iter(self._index.items()))
+                if last_use > deadline:
+                    break
+                self._index.popitem(last=False)
+                self._bytes -= size
+                self._expirations += 1
+                expired.append(name)
+            self._sweeps += 1
+
+        for name in expired:
+            self._remove(name)
+
+    def scan(self):
+        """
+        Reconciles the index with the folder: adopts untracked MP3 files, using their
+        modification time as last use, and deletes partial downloads, and any file in
+        the '.tmp' subfolder, older than 'max_age'.
+        """
+        now = time.time()
+        found = []
+
+        for entry in os.scandir(self.folder):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith('.part'):
+                if now - stat.st_mtime > self.max_age:
+                    self._remove(entry.name)
+            elif entry.name.endswith('.mp3'):
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+
+        try:
+            scratch = list(os.scandir(self.tmp_folder))
+        except OSError:
+            scratch = []
+
+        for entry in scratch:
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.max_age:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+        # newest first, each one moved to the front, so the oldest ends up first in line
+        with self._lock:
+            for mtime, name, size in sorted(found, reverse=True):
+                if name not in self._index:
+                    self._add(name, size, mtime, front=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'files': len(self._index),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_age': self.max_age,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'sweeps': self._sweeps,
+            }
+
+    def _add(self, name: str, size: int, last_use: float, front: bool = False):
+        if name in self._index:
+            self._bytes -= self._index.pop(name)[0]
+
+        self._index[name] = (size, last_use)
+        self._bytes += size
+        if front:
+            # adopted files have not been used by this process yet
+            self._index.move_to_end(name, last=False)
+
+        # never evict the last file left, even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            evicted, (evicted_size, _) = self._index.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+            self._remove(evicted)
+
+    def _remove(self, name: str):
+        try:
+            os.remove(self.path(name))
+        except OSError:
+            pass
+
+    def _start_sweeper(self):
+        pid = os.getpid()
+        if self._sweeper_pid == pid:
+            return
+
+        with self._lock:
+            if self._sweeper_pid == pid:
+                return
+            self._sweeper_pid = pid
+
+        threading.Thread(target=self._sweeper, name='audio-sweeper', daemon=True).start()
+
+    def _sweeper(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+                self.scan()
+            except Exception:
+                pass
+
+    def _after_fork(self):
+        # the sweeper thread does not survive fork, a new one starts on first use
+        self._lock = threading.Lock()
+        self._sweeper_pid = None
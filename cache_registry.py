@@ -0,0 +1,125 @@
+import functools
+import os
+import threading
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+
+
+class _Entry:
+    def __init__(self, name: str, cache: TTLCache, version):
+        self.name = name
+        self.cache = cache
+        self.version = version
+        self.current_version = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+class CacheRegistry:
+    """
+    Registry of named, independently sized TTL caches.
+
+    Each cached function gets its own 'TTLCache', so a function with many distinct
+    arguments can no longer evict the entries of another one. Size and TTL of every
+    cache can be overridden through the environment with 'CACHE_<NAME>_MAXSIZE' and
+    'CACHE_<NAME>_TTL' (e.g. 'CACHE_EMPLOYEE_BY_NAME_TTL').
+
+    A cache may be tied to a version function: whenever the version changes (e.g. a
+    new roster is loaded) the whole cache is dropped at once, so derived lookups are
+    invalidated together with the data they were derived from.
+    """
+
+    def __init__(self, default_maxsize: int = 128, default_ttl: float = 60):
+        self.default_maxsize = default_maxsize
+        self.default_ttl = default_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def cached(self, name: str, maxsize: int = None, ttl: float = None, version=None):
+        """
+        Decorator caching a function's results in the named cache.
+
+        Args:
+            name (str): Unique cache name, also used for the environment overrides.
+            maxsize (int, optional): Default maximum number of entries.
+            ttl (float, optional): Default time to live in seconds.
+            version (callable, optional): Function returning the version the cached
+                values depend on; the cache is cleared whenever it changes.
+
+        Returns:
+            callable: The decorator.
+        """
+        entry = self._register(name, maxsize, ttl, version)
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = hashkey(*args, **kwargs)
+                current_version = entry.version() if entry.version else None
+
+                with entry.lock:
+                    if current_version != entry.current_version:
+                        if entry.current_version is not None:
+                            entry.invalidations += 1
+                        entry.cache.clear()
+                        entry.current_version = current_version
+                    try:
+                        value = entry.cache[key]
+                        entry.hits += 1
+                        return value
+                    except KeyError:
+                        entry.misses += 1
+
+                value = fn(*args, **kwargs)
+
+                with entry.lock:
+                    if current_version == entry.current_version:
+                        entry.cache[key] = value
+
+                return value
+
+            wrapper.cache_name = name
+            return wrapper
+
+        return decorator
+
+    def clear(self, name: str = None):
+        """
+        Clears the named cache, or every cache when no name is given.
+        """
+        entries = [self._entries[name]] if name else list(self._entries.values())
+
+        for entry in entries:
+            with entry.lock:
+                entry.cache.clear()
+
+    def stats(self) -> dict:
+        stats = {}
+
+        for name, entry in self._entries.items():
+            with entry.lock:
+                stats[name] = {
+                    'size': len(entry.cache),
+                    'maxsize': entry.cache.maxsize,
+                    'ttl': entry.cache.ttl,
+                    'hits': entry.hits,
+                    'misses': entry.misses,
+                    'invalidations': entry.invalidations,
+                }
+
+        return stats
+
+    def _register(self, name: str, maxsize: int, ttl: float, version) -> _Entry:
+        prefix = f'CACHE_{name.upper()}'
+        maxsize = int(os.environ.get(f'{prefix}_MAXSIZE') or maxsize or self.default_maxsize)
+        ttl = float(os.environ.get(f'{prefix}_TTL') or ttl or self.default_ttl)
+
+        with self._lock:
+            if name in self._entries:
+                raise ValueError(f'Cache {name} is already registered')
+            entry = _Entry(name, TTLCache(maxsize=maxsize, ttl=ttl), version)
+            self._entries[name] = entry
+
+        return entry
@@ -0,0 +1,60 @@
+def normalize(value: str) -> str:
+    """
+    Normalizes a name or tag for lookups: lowercase, with collapsed whitespace.
+    """
+    return ' '.join(str(value).lower().split())
+
+
+class EmployeeDirectory:
+    """
+    Hash indexes over a roster, built once per roster fetch.
+
+    Ids are stored as 'int' in every index, whatever type the roster uses.
+
+    Looking up an employee by id, by full name or by tag (practice or job title)
+    is a dictionary access instead of a scan over all of 'employees['data']'.
+    """
+
+    def __init__(self, employees: dict):
+        """
+        Args:
+            employees (dict): The roster as returned by '/planningboard/employees'.
+        """
+        self.by_id = {}
+        self.names = {}
+        self.by_name = {}
+        self.by_tag = {}
+
+        for employee in employees['data']:
+            employee_id = int(employee['id'])
+            full_name = ' '.join([employee['name'], employee['surname']])
+
+            self.by_id.setdefault(employee_id, employee)
+            self.names.setdefault(employee_id, full_name)
+            self.by_name.setdefault(normalize(full_name), employee_id)
+
+            for tag in employee['tags']:
+                ids = self.by_tag.setdefault(normalize(tag['name']), [])
+                if employee_id not in ids:
+                    ids.append(employee_id)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def id_by_name(self, name: str) -> int:
+        """
+        Returns the id of the employee with the given full name, or -1 if not found.
+        """
+        return self.by_name.get(normalize(name), -1)
+
+    def name_by_id(self, employee_id: int):
+        """
+        Returns the full name of the employee with the given id, or -1 if not found.
+        """
+        return self.names.get(int(employee_id), -1)
+
+    def ids_by_tag(self, tag: str) -> list:
+        """
+        Returns the ids of the employees carrying the given tag, in roster order.
+        """
+        return list(self.by_tag.get(normalize(tag), ()))
@@ -30,3 +30,22 @@ class Allocation:
     def toString(self):
         return f"{self.name} Amount free: {self.amount_free} | Amount occupied: {self.amount_occupied}"
 
+
+
+class Availability:
+    def __init__(self, employee_id, name, hours_allocated, amount_occupied):
+        self.employee_id = employee_id
+        self.name = name
+        self.hours_allocated = hours_allocated
+        self.amount_occupied = amount_occupied
+        self.amount_free = 100 - amount_occupied
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "amount_occupied": f'{self.amount_occupied}%',
+            "amount_free": f'{self.amount_free}%',
+        }
+
+    def toString(self):
+        return Allocation(self.name, f'{self.amount_free}%', f'{self.amount_occupied}%').toString()
@@ -1,61 +1,53 @@
+import asyncio
 import os
-import requests
-from datetime import datetime, timedelta
-from cachetools import TTLCache, cached
-from openai import OpenAI
+from datetime import date, datetime, timedelta
+from openai import AsyncOpenAI, OpenAI
 import json
-from entities import Allocation
-from openai_functions import openai_func_check_availability, openai_func_check_employee_availability, openai_func_check_availability_by_job_title
-
-cache = TTLCache(maxsize=128, ttl=int(os.environ.get('CACHE_TTL')))
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from entities import Availability
+from llm import get_async_openai_client, get_openai_client
+from upstream import get_upstream_client
+from planning_cache import PlanningCache, window_end, window_start
+from singleflight import SingleFlight
+from roster import RosterProvider
+from cache_registry import CacheRegistry
+from directory import EmployeeDirectory, normalize
+from workcalendar import WorkCalendar, parse_closures
+from intent import FastPathStats, Intent, parse_date_range, parse_intent
+from answers import render_answer, render_answers
+from tool_results import count_tokens, encode_compact, encode_verbose
+from openai_functions import SYSTEM_PROMPT, TOOLS
+from sessions import Session
+
+logger = logging.getLogger(__name__)
+
+caches = CacheRegistry(default_maxsize=128, default_ttl=int(os.environ.get('CACHE_TTL')))
+
+# concurrent callers asking for the same upstream resource share one in-flight fetch
+upstream_flight = SingleFlight()
 
 JOB_TITLES = ['account director', 'account executive', 'account manager', 'art direction intern', 'art director', 'associate art director', 'associate content marketing manager', 'associate creative director', 'associate creative technologist', 'associate data analyst', 'associate design director', 'associate designer', 'associate experience design director', 'associate experience designer', 'associate program director', 'associate project director', 'associate project manager', 'associate strategy director', 'back-end developer', 'client partner', 'content marketing director', 'content marketing intern', 'content marketing manager', 'copywriter', 'copywriter intern', 'creative director c', 'data & research director', 'designer', 'director of client services', 'director of project management', 'director of strategy', 'director of technology', 'experience & design director', 'experience design intern', 'experience designer', 'experience writer', 'front-end developer', 'front-end leader', 'group account director', 'group creative director', 'junior frontend developer', 'operation lead', 'outsourcing manager', 'programme director', 'project manager', 'senior account director a', 'senior analyst', 'senior art director', 'senior consumer researcher', 'senior content marketing manager', 'senior copywriter', 'senior designer', 'senior experience designer', 'senior experience writer', 'senior project manager', 'senior strategist', 'social media strategist', 'strategist', 'strategy lead', 'technical artist', 'technical leader']
 PRACTICES = ['client services', 'content marketing', 'creative', 'data and research', 'delivery', 'design', 'experience', 'project management', 'strategy', 'technology']
 
-def get_headers() -> dict:
-    """
-    Fetches HTTP headers from environment variables.
-
-    This function constructs a dictionary of HTTP headers with values retrieved from environment variables.
-    The headers included are:
-    - "Cookie": Value obtained from the 'COOKIE' environment variable.
-    - "Accept": A static value set to "application/json, text/javascript, */*; q=0.01".
-    - "Referer": Value obtained from the 'REFERER' environment variable.
-    - "Origin": Value obtained from the 'ORIGIN' environment variable.
-
-    Returns:
-        dict: A dictionary containing the HTTP headers.
-    """
-    return {
-        "Cookie": os.environ.get('COOKIE'),
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "Referer": os.environ.get('REFERER'),
-        "Origin": os.environ.get('ORIGIN')
-    }
-
-
-def get_full_url(path: str) -> str:
-    """
-    Constructs a full URL by appending a given path to a base URL.
-
-    This function takes a relative path and appends it to the base URL, which is fetched from the 'BASE_URL' environment variable.
-
-    Args:
-        path (str): The relative path to be appended to the base URL.
-
-    Returns:
-        str: The full URL constructed by concatenating the base URL and the provided path.
-    """
-    return ''.join([os.environ.get('BASE_URL'), path])
+closures, recurring_closures = parse_closures(os.environ.get('WORK_CALENDAR_CLOSURES'))
+work_calendar = WorkCalendar(
+    first_year=int(os.environ.get('WORK_CALENDAR_FIRST_YEAR') or datetime.now().year - 2),
+    last_year=int(os.environ.get('WORK_CALENDAR_LAST_YEAR') or datetime.now().year + 3),
+    closures=closures,
+    recurring_closures=recurring_closures,
+    italian=(os.environ.get('WORK_CALENDAR_ITALIAN_HOLIDAYS') or '1') != '0',
+)
 
 
 def calculate_hours(from_date: str, to_date: str) -> int:
     """
-    Calculates the total number of work hours between two dates, excluding weekends.
+    Calculates the total number of work hours between two dates, excluding weekends and holidays.
 
-    This function computes the total work hours between a given 'from_date' and 'to_date'. 
-    Each workday (Monday to Friday) is considered to have 8 work hours. 
-    Saturdays and Sundays are excluded from the calculation. 
+    This function computes the total work hours between a given 'from_date' and 'to_date' 
+    using the shared 'work_calendar'. Each workday (Monday to Friday) is considered to have 
+    8 work hours. Saturdays, Sundays, Italian public holidays and the company closures listed 
+    in 'WORK_CALENDAR_CLOSURES' are excluded from the calculation. 
     If 'from_date' is greater than 'to_date', the function returns 0.
 
     Args:
@@ -63,31 +55,16 @@ def calculate_hours(from_date: str, to_date: str) -> int:
         to_date (str): The end date in 'YYYY-MM-DD' format.
 
     Returns:
-        int: The total number of work hours between the two dates, excluding weekends.
+        int: The total number of work hours between the two dates, excluding weekends and holidays.
     """
     # Convert strings to datetime objects
-    from_date = datetime.strptime(from_date, '%Y-%m-%d')
-    to_date = datetime.strptime(to_date, '%Y-%m-%d')
+    from_date = datetime.strptime(from_date, '%Y-%m-%d').date()
+    to_date = datetime.strptime(to_date, '%Y-%m-%d').date()
 
-    # Special case: from_date is greater than to_date
-    if from_date > to_date:
-        return 0
-
-    # Initialize the total hours
-    total_hours = 0
-
-    # Iterate over each day in the range, inclusive of boundaries
-    current_date = from_date
-    while current_date <= to_date:
-        # Check if the current day is a weekday (Monday=0, Sunday=6)
-        if current_date.weekday() < 5:  # 0 to 4 are weekdays
-            total_hours += 8
-        current_date += timedelta(days=1)
+    return work_calendar.hours(from_date, to_date)
 
-    return total_hours
 
-
-def calculate_load(load_hours: int, from_date: str, to_date: str) -> int:
+def calculate_load(load_hours: int, from_date: str, to_date: str, total_work_hours: int = None) -> int:
     """
     Calculates the percentage of load hours against total work hours between two dates.
 
@@ -95,16 +72,21 @@ def calculate_load(load_hours: int, from_date: str, to_date: str) -> int:
     between 'from_date' and 'to_date'. If 'total_work_hours' is 0, the function returns 0 
     to avoid division by zero.
 
+    When the same range is evaluated for many employees, 'total_work_hours' should be 
+    computed once with 'calculate_hours()' and passed in, so it is not recomputed per employee.
+
     Args:
         load_hours (int): The number of hours to calculate the percentage for.
         from_date (str): The start date in 'YYYY-MM-DD' format.
         to_date (str): The end date in 'YYYY-MM-DD' format.
+        total_work_hours (int, optional): The precomputed work hours of the range.
 
     Returns:
         int: The percentage of load hours relative to the total work hours, rounded to the nearest integer.
     """
     # Calculate the total work hours between the given dates
-    total_work_hours = calculate_hours(from_date, to_date)
+    if total_work_hours is None:
+        total_work_hours = calculate_hours(from_date, to_date)
 
     # Special case: If total_work_hours is 0, avoid division by zero
     if total_work_hours == 0:
@@ -116,38 +98,80 @@ def calculate_load(load_hours: int, from_date: str, to_date: str) -> int:
     return percentage
 
 
-@cached(cache)
-def get_employees() -> dict:
+def fetch_employees() -> dict:
     """
     Fetches a dictionary of employees from a remote API endpoint.
 
     This function makes a GET request to the '/planningboard/employees' endpoint 
-    using the 'requests' library. It includes headers fetched from environment variables 
-    via the 'get_headers()' function. If the request is successful (status code 200), 
-    it returns the JSON response parsed as a dictionary. If the request fails, 
-    it raises a requests.exceptions.HTTPError.
+    through the shared pooled client returned by 'get_upstream_client()'. Concurrent 
+    calls are coalesced into a single in-flight request. If the request is 
+    successful (status code 200), it returns the JSON response parsed as a dictionary. 
+    If the request fails, it raises a requests.exceptions.HTTPError.
 
     Returns:
         dict: A dictionary containing the employees fetched from the API endpoint.
     """
-    res = requests.get(get_full_url(
-        '/planningboard/employees'), headers=get_headers())
+    return upstream_flight.do(
+        ('employees',), get_upstream_client().get_json, '/planningboard/employees')
+
+
+roster = RosterProvider(
+    fetch_employees,
+    soft_ttl=float(os.environ.get('ROSTER_SOFT_TTL') or os.environ.get('CACHE_TTL')),
+    hard_ttl=float(os.environ.get('ROSTER_HARD_TTL') or 3600),
+    build=EmployeeDirectory,
+)
+
 
-    if res.status_code == 200:
-        return res.json()
+def get_employees() -> dict:
+    """
+    Returns the dictionary of employees held by the roster provider.
 
-    raise requests.exceptions.HTTPError
+    After the first load the roster is always served from memory: once it is older 
+    than 'ROSTER_SOFT_TTL' it is refreshed in the background via 'fetch_employees()', 
+    and the last good copy keeps being served if the upstream is failing.
 
+    Returns:
+        dict: A dictionary containing the employees fetched from the API endpoint.
+    """
+    return roster.get()
 
-@cached(cache)
+
+def get_directory() -> EmployeeDirectory:
+    """
+    Returns the indexed directory built from the roster served by 'get_employees()'.
+
+    The directory is built once per roster fetch and offers O(1) lookups by id, 
+    by full name and by tag (practice or job title).
+
+    Returns:
+        EmployeeDirectory: The directory of the current roster.
+    """
+    return roster.index()
+
+
+def get_roster_version() -> int:
+    """
+    Returns the version of the roster currently served by 'get_employees()'.
+
+    Caches of values derived from the roster are tied to this version, so they are 
+    all invalidated together as soon as a new roster is loaded.
+
+    Returns:
+        int: The roster version, bumped on every successful roster refresh.
+    """
+    get_employees()
+    return roster.version
+
+
+@caches.cached('employees_from_practice', version=get_roster_version)
 def get_employees_from_practice(practice: str) -> list:
     """
-    Fetches a list of employee IDs associated with a specific practice from a cached dictionary of employees.
+    Fetches a list of employee IDs associated with a specific practice from the indexed employee directory.
 
-    This function retrieves a cached dictionary of employees using the 'get_employees()' function. 
-    It then filters through the employees based on a provided 'practice' string, which is compared 
-    against the 'name' attribute in each employee's 'tags' list (case-insensitive comparison). 
-    If a match is found, the employee's ID is appended to the 'found' list.
+    This function looks up the provided 'practice' string in the tag index of the directory 
+    returned by 'get_directory()', where each employee's 'tags' are indexed by their 'name' 
+    attribute (case-insensitive comparison).
 
     Args:
         practice (str): The practice to filter employees by.
@@ -155,25 +179,15 @@ def get_employees_from_practice(practice: str) -> list:
     Returns:
         list: A list of employee IDs associated with the specified practice.
     """
-    employees = get_employees()
-    practice = practice.lower()
-    found = []
-
-    for employee in employees['data']:
-        for tag in employee['tags']:
-            if tag['name'].lower() == practice:
-                found.append(employee['id'])
-
-    return found
+    return get_directory().ids_by_tag(practice)
 
 def get_employees_by_job_title(job_title: str) -> list:
     """
-    Fetches a list of employee IDs associated with a specific job title from a cached dictionary of employees.
+    Fetches a list of employee IDs associated with a specific job title from the indexed employee directory.
 
-    This function retrieves a cached dictionary of employees using the 'get_employees()' function. 
-    It then filters through the employees based on a provided 'job_title' string, which is compared 
-    against the 'job_title' attribute in each employee's 'tags' list (case-insensitive comparison). 
-    If a match is found, the employee's ID is appended to the 'found' list.
+    This function looks up the provided 'job_title' string in the tag index of the directory 
+    returned by 'get_directory()', where each employee's 'tags' are indexed by their 'name' 
+    attribute (case-insensitive comparison).
 
     Args:
         job_title (str): The job title to filter employees by.
@@ -181,26 +195,17 @@ def get_employees_by_job_title(job_title: str) -> list:
     Returns:
         list: A list of employee IDs associated with the specified job title.
     """
-    employees = get_employees()
-    job_title = job_title.lower()
-    found = []
-
-    for employee in employees['data']:
-        for tag in employee['tags']:
-            if tag['name'].lower() == job_title:
-                found.append(employee['id'])
+    return get_directory().ids_by_tag(job_title)
 
-    return found
-
-@cached(cache)
+@caches.cached('employee_by_name', version=get_roster_version)
 def get_employee_by_name(name: str) -> int:
     """
-    Fetches the ID of an employee by their full name from a cached dictionary of employees.
+    Fetches the ID of an employee by their full name from the indexed employee directory.
 
-    This function retrieves a cached dictionary of employees using the 'get_employees()' function. 
-    It searches for an employee whose full name (concatenation of 'name' and 'surname' attributes) 
-    matches the provided 'name' parameter (case-insensitive comparison). If a matching employee is found, 
-    the function returns their ID. If no match is found, it returns -1.
+    This function looks up the provided 'name' parameter in the full name index (concatenation 
+    of 'name' and 'surname' attributes, case-insensitive comparison) of the directory returned by 
+    'get_directory()'. If a matching employee is found, the function returns their ID. 
+    If no match is found, it returns -1.
 
     Args:
         name (str): The full name of the employee to fetch.
@@ -208,26 +213,17 @@ def get_employee_by_name(name: str) -> int:
     Returns:
         int: The ID of the employee if found, otherwise -1.
     """
-    employees = get_employees()
-    name = name.lower()
-    found = -1
-
-    for employee in employees['data']:
-        if name == ' '.join([employee['name'], employee['surname']]).lower():
-            return employee['id']
+    return get_directory().id_by_name(name)
 
-    return found
 
-
-@cached(cache)
+@caches.cached('employee_name_by_id', version=get_roster_version)
 def get_employee_name_by_id(employee_id: int) -> int:
     """
-    Fetches the full name of an employee by their ID from a cached dictionary of employees.
+    Fetches the full name of an employee by their ID from the indexed employee directory.
 
-    This function retrieves a cached dictionary of employees using the 'get_employees()' function. 
-    It searches for an employee whose ID matches the provided 'employee_id' parameter. If a matching 
-    employee is found, the function returns their full name (concatenation of 'name' and 'surname' attributes). 
-    If no match is found, it returns -1.
+    This function looks up the provided 'employee_id' parameter in the id index of the directory 
+    returned by 'get_directory()'. If a matching employee is found, the function returns their 
+    full name (concatenation of 'name' and 'surname' attributes). If no match is found, it returns -1.
 
     Args:
         employee_id (int): The ID of the employee to fetch.
@@ -235,26 +231,19 @@ def get_employee_name_by_id(employee_id: int) -> int:
     Returns:
         str: The full name of the employee if found, otherwise -1.
     """
-    employees = get_employees()
-    found = -1
+    return get_directory().name_by_id(employee_id)
 
-    for employee in employees['data']:
-        if employee_id == int(employee['id']):
-            return ' '.join([employee['name'], employee['surname']])
 
-    return found
-
-
-def get_plannings(from_date: str, to_date: str) -> dict:
+def fetch_plannings(from_date: str, to_date: str) -> dict:
     """
     Fetches planning data from a remote API endpoint based on specified date range.
 
     This function makes a GET request to the '/planningboard/' endpoint 
-    using the 'requests' library. It includes headers fetched from environment variables 
-    via the 'get_headers()' function and query parameters 'from' and 'to' set to 
-    the provided 'from_date' and 'to_date' parameters. If the request is successful 
-    (status code 200), it returns the JSON response parsed as a dictionary. If the 
-    request fails, it raises a requests.exceptions.HTTPError.
+    through the shared pooled client returned by 'get_upstream_client()', with query 
+    parameters 'from' and 'to' set to the provided 'from_date' and 'to_date' parameters. 
+    Concurrent calls for the same range are coalesced into a single in-flight request. 
+    If the request is successful (status code 200), it returns the JSON response parsed 
+    as a dictionary. If the request fails, it raises a requests.exceptions.HTTPError.
 
     Args:
         from_date (str): The start date in 'YYYY-MM-DD' format.
@@ -263,77 +252,132 @@ def get_plannings(from_date: str, to_date: str) -> dict:
     Returns:
         dict: A dictionary containing the planning data fetched from the API endpoint.
     """
-    response = requests.get(get_full_url(
-        '/planningboard/'), headers=get_headers(), params={
-        "from": from_date,
-        "to": to_date
-    })
+    return upstream_flight.do(
+        ('plannings', from_date, to_date), get_upstream_client().get_json, '/planningboard/', params={
+            "from": from_date,
+            "to": to_date
+        })
 
-    if response.status_code == 200:
-        return response.json()
 
-    raise requests.exceptions.HTTPError()
+planning_cache = PlanningCache(
+    fetch_plannings,
+    window=os.environ.get('PLANNING_CACHE_WINDOW') or 'week',
+    ttl=int(os.environ.get('PLANNING_CACHE_TTL') or os.environ.get('CACHE_TTL')),
+    maxsize=int(os.environ.get('PLANNING_CACHE_MAXSIZE') or 256),
+)
 
 
-def check_availability(practice: str, from_date: str, to_date: str) -> list:
+def get_plannings(from_date: str, to_date: str) -> dict:
     """
-    Checks the availability of employees in a specific practice within a given date range.
+    Fetches planning data for the specified date range through the planning cache.
 
-    This function retrieves the list of employee IDs associated with the specified practice 
-    using the 'get_employees_from_practice()' function. It then fetches planning data 
-    from the '/planningboard/' endpoint using the 'get_plannings()' function for the 
-    provided 'from_date' and 'to_date'. Based on the retrieved data, it determines the 
-    availability of each employee during that period.
+    The range is served from cached aligned windows (ISO weeks by default, see 
+    'PLANNING_CACHE_WINDOW') and only the windows that are not cached yet are 
+    fetched from the '/planningboard/' endpoint via 'fetch_plannings()'.
+
+    Args:
+        from_date (str): The start date in 'YYYY-MM-DD' format.
+        to_date (str): The end date in 'YYYY-MM-DD' format.
+
+    Returns:
+        dict: A dictionary containing the planning data for the given date range.
+    """
+    return planning_cache.get(from_date, to_date)
+
+
+def select_employees(kind: str, target: str):
+    """
+    Resolves an availability selector to the IDs of the employees it selects.
+
+    Args:
+        kind (str): One of "practice", "job_title" or "employee".
+        target (str): The practice, job title or employee full name.
+
+    Returns:
+        list: The selected employee IDs, or a dictionary with an "error" key when the 
+        job title or the employee is unknown.
+    """
+    if kind == 'practice':
+        return get_employees_from_practice(target)
+
+    if kind == 'job_title':
+        if target.lower() not in JOB_TITLES:
+            return {'error': 'Job title not found.'}
+        return get_employees_by_job_title(target.lower())
+
+    employee_id = get_employee_by_name(target)
+
+    if employee_id < 0:
+        return {'error': 'Employee not found.'}
+
+    return [employee_id]
+
+
+def compute_availability(employee_ids: list, from_date: str, to_date: str) -> list:
+    """
+    Computes the availability of a set of employees within a given date range.
+
+    This is the single availability engine behind 'check_availability()', 
+    'check_employee_availability()' and 'check_employee_availability_by_jobtitle()'. 
+    It fetches the planning data once through 'get_plannings()', computes the work hours 
+    of the range once, and sums the allocated slot amounts of every requested employee 
+    in a single pass over the plannings.
 
     If an employee ID does not appear in the planning data, it means the employee has 
-    no allocations and is considered 100% available. If an employee ID appears in the 
-    planning data, the function calculates the total allocated hours and computes 
-    the percentage of availability using the 'calculate_load()' function.
+    no allocations and is considered 100% available.
 
     Args:
-        practice (str): The practice name to filter employees by.
+        employee_ids (list): The IDs of the employees to evaluate.
         from_date (str): The start date in 'YYYY-MM-DD' format.
         to_date (str): The end date in 'YYYY-MM-DD' format.
 
     Returns:
-        list: A list of dictionaries containing the names and availability percentages 
-        of employees in the specified practice during the given date range.
+        list: A list of 'Availability' objects, in the same order as 'employee_ids'.
     """
-    # mi serve un <practice> da <from_date> a <to_date>
+    plannings = get_plannings(from_date, to_date)
+    total_work_hours = calculate_hours(from_date, to_date)
 
-    # prendo gli employee di quella practice (solo id)
-    employees = get_employees_from_practice(practice)
+    # somma delle allocazioni in un solo passaggio sulle plannings
+    allocated = {str(employee_id): 0 for employee_id in employee_ids}
 
-    # prendo tutte le allocazioni da <from_date> a <to_date>
-    plannings = get_plannings(from_date, to_date)
+    for employee_id, slots in (plannings['data']['plannings'] or {}).items():
+        if employee_id in allocated:
+            for slot in slots:
+                allocated[employee_id] += slot['amount']
 
     availabilities = []
 
-    for employee_id in employees:
-        if str(employee_id) not in plannings['data']['plannings']:
-            # l'id non appare, quindi significa che non esiste alcuna allocazione.
-            # nessuna allocazione significa che la risorsa e' al 100% libera.
-            availabilities.append({
-                "name": get_employee_name_by_id(employee_id),
-                "amount": f'{calculate_load(0, from_date, to_date)}%'
-            })
-        else:
-            # la risorsa non e' libera al 100% perche' appare nelle allocazioni
-            total_amount = 0
+    for employee_id in employee_ids:
+        total_amount = allocated[str(employee_id)]
+        amount_occupied = int(calculate_load(
+            total_amount, from_date, to_date, total_work_hours))
 
-            for slot in plannings['data']['plannings'][str(employee_id)]:
-                total_amount = total_amount + slot['amount']
+        availabilities.append(Availability(
+            employee_id, get_employee_name_by_id(employee_id), total_amount, amount_occupied))
 
-            amount_occupied = int(calculate_load(
-                total_amount, from_date, to_date))
+    return availabilities
 
-            availabilities.append({
-                "name": get_employee_name_by_id(employee_id),
-                "amount_occupied": f'{amount_occupied}%',
-                "amount_free": f'{100 - amount_occupied}%',
-            })
 
-    return availabilities
+def check_availability(practice: str, from_date: str, to_date: str) -> list:
+    """
+    Checks the availability of employees in a specific practice within a given date range.
+
+    This function retrieves the list of employee IDs associated with the specified practice 
+    using the 'get_employees_from_practice()' function and evaluates them with 
+    'compute_availability()'.
+
+    Args:
+        practice (str): The practice name to filter employees by.
+        from_date (str): The start date in 'YYYY-MM-DD' format.
+        to_date (str): The end date in 'YYYY-MM-DD' format.
+
+    Returns:
+        list: A list of dictionaries containing the names and availability percentages 
+        of employees in the specified practice during the given date range.
+    """
+    employees = get_employees_from_practice(practice)
+
+    return [availability.to_dict() for availability in compute_availability(employees, from_date, to_date)]
 
 
 def check_employee_availability(employee_name, from_date, to_date):
@@ -346,83 +390,301 @@ def check_employee_availability(employee_name, from_date, to_date):
         to_date (str): The end date of the period to check, in YYYY-MM-DD format.
 
     Returns:
-        dict: A dictionary containing:
+        list: A list with a single dictionary containing:
             - "name" (str): The name of the employee.
             - "amount_occupied" (str): The percentage of time the employee is occupied.
             - "amount_free" (str): The percentage of time the employee is free.
-
-    Raises:
-        ValueError: If the employee_name is not found.
+        If the employee is not found, a dictionary with an "error" key is returned instead.
 
     Example:
         >>> check_employee_availability("John Doe", "2023-07-01", "2023-07-31")
-        {
+        [{
             "name": "John Doe",
             "amount_occupied": "40%",
             "amount_free": "60%"
-        }
+        }]
     """
     employee_id = get_employee_by_name(employee_name)
 
     if employee_id < 0:
         return {'error': 'Employee not found.'}
 
-    plannings = get_plannings(from_date, to_date)
+    return [availability.to_dict() for availability in compute_availability([employee_id], from_date, to_date)]
+
+
+def prefetch_ranges(ranges, executor):
+    """
+    Loads the planning windows of several date ranges concurrently.
+
+    Ranges whose windows touch or overlap are merged first, so every window is 
+    fetched by a single prefetch; the merged spans are then prefetched in parallel 
+    on 'executor' and the function returns when all of them are cached.
+
+    Args:
+        ranges (iterable): (from_date, to_date) tuples in 'YYYY-MM-DD' format.
+        executor (Executor): Where the prefetches run.
+    """
+    spans = []
+
+    for from_date, to_date in sorted(ranges):
+        start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+        if start > end:
+            continue
+        # the next window starts the day after the window of the last span ends
+        if spans and window_start(start, planning_cache.window) <= \
+                window_end(window_start(spans[-1][1], planning_cache.window), planning_cache.window) + timedelta(days=1):
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+
+    futures = [executor.submit(planning_cache.prefetch, start.isoformat(), end.isoformat())
+               for start, end in spans]
+
+    for future in futures:
+        future.result()
+
+
+def check_availability_batch(selectors: list, ranges: list) -> list:
+    """
+    Evaluates several availability selectors over one or more date ranges at once.
+
+    The planning data of every distinct range is loaded concurrently through the planning 
+    cache with 'prefetch_ranges()' before any selector runs, so selectors sharing a range 
+    (or overlapping windows) share a single upstream fetch. The selectors are then 
+    evaluated concurrently on the same bounded thread pool ('BATCH_WORKERS').
+
+    Args:
+        selectors (list): Dictionaries with exactly one of the keys "practice", 
+            "employee" or "job_title".
+        ranges (list): Dictionaries with the "from_date" and "to_date" keys, 
+            in 'YYYY-MM-DD' format.
+
+    Returns:
+        list: One dictionary per (range, selector) pair, in order, containing the 
+        selector, the range and either an "availability" list or an "error" message.
+    """
+    def evaluate(query):
+        selector, date_range = query
+        from_date, to_date = date_range['from_date'], date_range['to_date']
+
+        if 'practice' in selector:
+            response = check_availability(selector['practice'], from_date, to_date)
+        elif 'employee' in selector:
+            response = check_employee_availability(selector['employee'], from_date, to_date)
+        else:
+            response = check_employee_availability_by_jobtitle(selector['job_title'], from_date, to_date)
+
+        result = dict(selector, from_date=from_date, to_date=to_date)
+
+        if "error" in response:
+            result['error'] = response.get("error")
+        else:
+            result['availability'] = response
+
+        return result
+
+    queries = [(selector, date_range) for date_range in ranges for selector in selectors]
+
+    with ThreadPoolExecutor(max_workers=int(os.environ.get('BATCH_WORKERS') or 8)) as executor:
+        prefetch_ranges({(r['from_date'], r['to_date']) for r in ranges}, executor)
+        return list(executor.map(evaluate, queries))
+
+
+def record_usage(usage, stage: str, meta: dict = None):
+    """
+    Logs the token usage of a completion, including the prompt tokens served from the 
+    provider-side prompt cache, and records it in 'meta' under 'usage'.
+
+    Args:
+        usage: The 'usage' field of a completion, possibly None.
+        stage (str): Which completion it belongs to, e.g. 'tools' or 'answer'.
+        meta (dict, optional): The response metadata to fill.
+    """
+    if usage is None:
+        return
+
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached_tokens = (getattr(details, 'cached_tokens', None) or 0) if details else 0
+
+    logger.info('%s completion: prompt_tokens=%s cached_tokens=%s completion_tokens=%s',
+                stage, usage.prompt_tokens, cached_tokens, usage.completion_tokens)
+
+    if meta is not None:
+        meta.setdefault('usage', {})[stage] = {
+            'prompt_tokens': usage.prompt_tokens,
+            'cached_tokens': cached_tokens,
+            'completion_tokens': usage.completion_tokens,
+        }
 
-    # la risorsa e' libera al 100% perche' non appare nelle allocazioni
-    if str(employee_id) not in plannings['data']['plannings']:
-        return [{
-            "name": employee_name,
-            "amount_occupied": "0%",
-            "amount_free": "100%"
-        }]
 
-    # la risorsa non e' libera al 100% perche' appare nelle allocazioni
-    total_amount = 0
-
-    for slot in plannings['data']['plannings'][str(employee_id)]:
-        total_amount = total_amount + slot['amount']
-
-    amount_occupied = int(calculate_load(total_amount, from_date, to_date))
-
-    return [{
-        "name": employee_name,
-        "amount_occupied": f'{amount_occupied}%',
-        "amount_free": f'{100 - amount_occupied}%',
-    }]
-
-
-def GPT_conversation(prompt: str) -> str:
-    # PRACTICES = ["Technology", "Experience", "strategy", "project management", "creative", "copywriter"]
-    
-    client = OpenAI()
-    current_year = datetime.now().year
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    #prompt = prompt + \
-     #   " \n If no year is specified assume the year is %s \n Today is %s \n Answer by providing the answer in a natural language without adding any questions or further details" % (current_year, current_date)
-    
-    #italian prompt
-    prompt = prompt + \
-        " \n Se non viene specificato l'anno, assumi che l'anno sia %s. \n La data di oggi è: %s. \n Rispondi fornendo la risposta in linguaggio naturale senza aggiungere domande o ulteriori dettagli.\n Rispondi sempre in italiano." % (current_year, current_date)
-
-    tools = [
-        openai_func_check_availability,
-        openai_func_check_employee_availability,
-        openai_func_check_availability_by_job_title      
-    ]
-
-    messages = [
-        {"role": "user", "content": prompt},
-    ]
-
-    response = client.chat.completions.create(
+def user_message(prompt: str) -> dict:
+    """
+    Returns the user message of a prompt, with today's date appended.
+    """
+    return {"role": "user", "content": "%s\n\nData di oggi: %s" % (prompt, datetime.now().strftime("%Y-%m-%d"))}
+
+
+def conversation_turn(messages: list, answer: str) -> list:
+    """
+    Returns the messages of a turn to store in the session history.
+
+    The tool calls and their results are kept, so follow-up questions can refer to 
+    them, but only when every call has its result: a turn interrupted by a tool error 
+    is reduced to the question and the answer.
+
+    Args:
+        messages (list): The messages of the turn, from the user message onwards.
+        answer (str): The final answer.
+
+    Returns:
+        list: The messages of the turn, ending with the answer.
+    """
+    calls = sum(len(message.get("tool_calls") or []) for message in messages)
+    results = sum(1 for message in messages if message["role"] == "tool")
+
+    if calls != results:
+        messages = messages[:1]
+
+    return messages + [{"role": "assistant", "content": answer}]
+
+
+prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PREFETCH_WORKERS') or 2), thread_name_prefix='prefetch')
+
+
+def prefetch_planning(from_date: str, to_date: str):
+    try:
+        planning_cache.prefetch(from_date, to_date)
+    except Exception:
+        logger.warning('speculative prefetch of %s..%s failed', from_date, to_date, exc_info=True)
+
+
+def speculative_prefetch(prompt: str, meta: dict = None):
+    """
+    Warms the data a question will most likely need while the model picks a tool.
+
+    The roster is refreshed in the background if missing or stale and, when a date 
+    range can be extracted locally from the prompt with 'parse_date_range()', the 
+    planning windows covering it are loaded on 'prefetch_executor'. Nothing waits for 
+    the prefetch: when the tool calls arrive they either hit the warm caches or join 
+    the fetch still in flight through 'upstream_flight'. Disabled by 'SPECULATIVE_PREFETCH=0'.
+
+    Args:
+        prompt (str): The user prompt.
+        meta (dict, optional): Filled with the prefetched range under 'prefetch'.
+    """
+    if (os.environ.get('SPECULATIVE_PREFETCH') or '1') == '0':
+        return
+
+    roster.warm()
+
+    date_range = parse_date_range(normalize(prompt.replace('’', "'")), date.today())
+    if date_range is None or date_range[0] > date_range[1]:
+        return
+
+    from_date, to_date = date_range[0].isoformat(), date_range[1].isoformat()
+    prefetch_executor.submit(prefetch_planning, from_date, to_date)
+
+    if meta is not None:
+        meta['prefetch'] = [from_date, to_date]
+
+
+def tool_selection_request(prompt: str, meta: dict = None, history: list = None) -> dict:
+    """
+    Builds the arguments of the first, tool-selecting completion of a conversation.
+
+    The static instructions and tools come first, then the session history, which only 
+    grows at the end, and the new prompt with the date appended. The data the question 
+    is likely about is prefetched with 'speculative_prefetch()' while the model is thinking.
+
+    Args:
+        prompt (str): The user prompt.
+        meta (dict, optional): See 'run_tool_calls()'.
+        history (list, optional): The messages of the previous turns of the session.
+
+    Returns:
+        dict: The keyword arguments of 'chat.completions.create()'.
+    """
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}] + (history or []) + [user_message(prompt)]
+
+    speculative_prefetch(prompt, meta)
+
+    return dict(
         model="gpt-4o",
         messages=messages,
-        tools=tools,
+        tools=TOOLS,
         tool_choice="auto",  # auto is default, but we'll be explicit
     )
 
-    response_message = response.choices[0].message
+
+def answer_request(messages: list) -> dict:
+    """
+    Builds the arguments of the final completion, turning the tool results in 'messages' 
+    into the answer.
+    """
+    # same prefix as the first call, so it is served from the prompt cache
+    return dict(model="gpt-4o", messages=messages, tools=TOOLS, tool_choice="none")
+
+
+def run_tool_calls(client: OpenAI, prompt: str, render_locally: bool = False, meta: dict = None,
+                   history: list = None) -> tuple:
+    """
+    Runs the first, tool-selecting completion of a conversation and executes the tool calls.
+
+    Args:
+        client (OpenAI): The OpenAI client to use.
+        prompt (str): The user prompt.
+        render_locally (bool): Whether the final answer is rendered from the structured 
+            tool results with 'render_answers()' instead of a second completion.
+        meta (dict, optional): Filled with response metadata, i.e. the token usage of the 
+            completions and the token counts of the tool results in the verbose and in the 
+            compact encoding.
+        history (list, optional): The messages of the previous turns of the session.
+
+    Returns:
+        tuple: (messages, answer). When 'answer' is not None the conversation is already 
+        over (the model answered without tools, a tool returned an error, or the answer 
+        was rendered locally) and no second completion is needed; otherwise 'messages' 
+        holds the conversation extended with the tool results, ready for the final completion.
+    """
+    request = tool_selection_request(prompt, meta, history)
+
+    response = client.chat.completions.create(**request)
+    record_usage(response.usage, 'tools', meta)
+
+    return execute_tool_calls(request['messages'], response.choices[0].message, render_locally, meta)
+
+
+async def run_tool_calls_async(client: AsyncOpenAI, prompt: str, render_locally: bool = False,
+                               meta: dict = None, history: list = None) -> tuple:
+    """
+    Async variant of 'run_tool_calls()'.
+
+    The completion is awaited on the event loop, while the tool calls, which go through 
+    the blocking roster and planning caches, run in a worker thread.
+    """
+    request = tool_selection_request(prompt, meta, history)
+
+    response = await client.chat.completions.create(**request)
+    record_usage(response.usage, 'tools', meta)
+
+    return await asyncio.to_thread(execute_tool_calls, request['messages'], response.choices[0].message,
+                                   render_locally, meta)
+
+
+def execute_tool_calls(messages: list, response_message, render_locally: bool = False, meta: dict = None) -> tuple:
+    """
+    Executes the tool calls requested by the tool-selecting completion.
+
+    Args:
+        messages (list): The messages sent to the tool-selecting completion.
+        response_message: The message of the tool-selecting completion.
+        render_locally (bool): See 'run_tool_calls()'.
+        meta (dict, optional): See 'run_tool_calls()'.
+
+    Returns:
+        tuple: (messages, answer), see 'run_tool_calls()'.
+    """
     tool_calls = response_message.tool_calls
 
     # Step 2: check if the model wanted to call a function
@@ -430,78 +692,267 @@ def GPT_conversation(prompt: str) -> str:
         # Step 3: call the function
         # Note: the JSON response may not always be valid; be sure to handle errors
 
-        # we filter tools to fetch each item function.name parameter and create a dictionary with the function name as key and value
-        
+        # each tool selects a group of employees: (kind of selector, name of the argument holding it)
         available_functions = {
-            "check_availability":check_availability,
-            "check_employee_availability":check_employee_availability,
-            "check_employee_availability_by_jobtitle":check_employee_availability_by_jobtitle,
+            "check_availability": ("practice", "practice"),
+            "check_employee_availability": ("employee", "employee_name"),
+            "check_employee_availability_by_jobtitle": ("job_title", "job_title"),
         }
         
-        # extend conversation with assistant's reply
-        messages.append(response_message)
+        # extend conversation with assistant's reply, as a plain dict so it can be kept in the session
+        messages.append({
+            "role": "assistant",
+            "content": response_message.content,
+            "tool_calls": [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments},
+                }
+                for tool_call in tool_calls
+            ],
+        })
+
+        def execute(tool_call):
+            kind, argument = available_functions[tool_call.function.name]
+            function_args = json.loads(tool_call.function.arguments)
+            intent = Intent(kind, function_args.get(argument),
+                            function_args.get("from_date"), function_args.get("to_date"))
+
+            employees = select_employees(intent.kind, intent.target)
 
-        # Step 4: send the info for each function call and function response to the model
+            if "error" in employees:
+                return intent, employees
+
+            return intent, compute_availability(employees, intent.from_date, intent.to_date)
+
+        # load every distinct date range once and in parallel, so calls sharing a range share one planning fetch
+        date_ranges = set()
         for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_to_call = available_functions[function_name]
             function_args = json.loads(tool_call.function.arguments)
+            if function_args.get("from_date") and function_args.get("to_date"):
+                date_ranges.add((function_args.get("from_date"), function_args.get("to_date")))
 
-            if function_name == "check_availability":
-                function_response = function_to_call(
-                    practice=function_args.get("practice"),
-                    from_date=function_args.get("from_date"),
-                    to_date=function_args.get("to_date"),
-                )
-            elif function_name == "check_employee_availability":
-                function_response = function_to_call(
-                    employee_name=function_args.get("employee_name"),
-                    from_date=function_args.get("from_date"),
-                    to_date=function_args.get("to_date"),
-                )
-            elif function_name == "check_employee_availability_by_jobtitle":
-                function_response = function_to_call(
-                    job_title=function_args.get("job_title"),
-                    from_date=function_args.get("from_date"),
-                    to_date=function_args.get("to_date"),
-                )
-
-                # for each item in the response, create a new Allocation with it and add its toString() to the list
-
-            function_response_to_str = []
+        # Step 4: run the function calls concurrently, then send each function response to the model in order
+        if len(tool_calls) == 1:
+            function_responses = [execute(tool_calls[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(tool_calls), int(os.environ.get('TOOL_CALL_WORKERS') or 4))) as executor:
+                prefetch_ranges(date_ranges, executor)
+                function_responses = list(executor.map(execute, tool_calls))
 
+        for tool_call, (intent, function_response) in zip(tool_calls, function_responses):
             # if function_response contain an error property it's an error, return the error message
             if "error" in function_response:
-                return function_response.get("error")
+                return messages, function_response.get("error")
 
-            for item in function_response:
-                function_response_to_str.append(Allocation(item.get("name"), item.get(
-                    "amount_free"), item.get("amount_occupied")).toString())
+            # compact table instead of one verbose line per employee, to cut prompt tokens
+            function_response_to_str = encode_compact(
+                function_response, top_n=int(os.environ.get('TOOL_RESULT_TOP_N') or 20))
 
-            function_response_to_str = "\n".join(function_response_to_str)
-            # print("FR: ",function_response_to_str, function_args.get("practice"), function_args.get("from_date"), function_args.get("to_date"))
+            if meta is not None:
+                tokens = meta.setdefault('tool_result_tokens', {'verbose': 0, 'compact': 0})
+                tokens['verbose'] += count_tokens(encode_verbose(function_response))
+                tokens['compact'] += count_tokens(function_response_to_str)
 
             messages.append(
                 {
                     "tool_call_id": tool_call.id,
                     "role": "tool",
-                    "name": function_name,
+                    "name": tool_call.function.name,
                     "content": function_response_to_str,
                 }
             )
 
-        second_response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-        )  # get a new response from the model where it can see the function response
+        if render_locally:
+            return messages, render_answers(function_responses, top_n=int(os.environ.get('ANSWER_TOP_N') or 5))
+
+        return messages, None
 
-        # print (second_response.choices[0].message.content)
-        return second_response.choices[0].message.content
+    return messages, response_message.content
+
+
+fast_path_stats = FastPathStats()
+
+
+def answer_fast_path(prompt: str):
+    """
+    Answers common availability questions without the LLM.
+
+    The prompt is parsed locally with 'parse_intent()' against 'PRACTICES', 'JOB_TITLES' 
+    and the roster names. When the parser is confident the availability is computed 
+    directly and the answer is rendered from a template; otherwise None is returned so 
+    the caller can fall back to the LLM. Hits and misses are counted in 
+    'fast_path_stats'. Disabled by 'FAST_PATH=0', which sends every question to the LLM.
+
+    Args:
+        prompt (str): The user prompt.
+
+    Returns:
+        str: The answer, or None when the question is left to the LLM.
+    """
+    if (os.environ.get('FAST_PATH') or '1') == '0':
+        return None
+
+    directory = get_directory()
+    intent = parse_intent(prompt, date.today(), PRACTICES, JOB_TITLES, list(directory.by_name))
+
+    if intent is None:
+        fast_path_stats.record(False)
+        return None
+
+    employees = select_employees(intent.kind, intent.target)
+    availabilities = compute_availability(employees, intent.from_date, intent.to_date)
+    fast_path_stats.record(True)
+
+    return render_answer(intent, availabilities, top_n=int(os.environ.get('ANSWER_TOP_N') or 5))
+
+
+def fast_path_answered(prompt: str, answer: str, meta: dict, session: Session = None) -> bool:
+    """
+    Records in 'meta' whether the fast path answered and, if so, adds the turn to the session.
+    """
+    meta['fast_path'] = answer is not None
+
+    if answer is not None and session is not None:
+        session.add_turn([user_message(prompt), {"role": "assistant", "content": answer}])
+
+    return answer is not None
+
+
+async def answer_question_async(prompt: str, render_locally: bool = False, meta: dict = None,
+                                session: Session = None) -> str:
+    """
+    Answers an availability question, through the fast path when possible.
+
+    To be awaited on the 'aio' event loop; the fast path, which goes through the blocking 
+    roster and planning caches, runs in a worker thread.
+
+    Args:
+        prompt (str): The user prompt.
+        render_locally (bool): Whether, on the LLM path, the final answer is rendered 
+            locally instead of with a second completion.
+        meta (dict, optional): Filled with response metadata: whether the fast path 
+            answered and, on the LLM path, what 'GPT_conversation_async()' reports.
+        session (Session, optional): The chat session; its history is sent to the model 
+            and the new turn is added to it.
+
+    Returns:
+        str: The answer in natural language.
+    """
+    meta = {} if meta is None else meta
+    answer = await asyncio.to_thread(answer_fast_path, prompt)
+
+    if fast_path_answered(prompt, answer, meta, session):
+        return answer
+
+    return await GPT_conversation_async(prompt, render_locally, meta, session)
+
+
+def answer_question_stream(prompt: str, render_locally: bool = False, meta: dict = None,
+                           session: Session = None):
+    """
+    Streaming variant of 'answer_question_async()', for the worker threads.
+
+    Yields:
+        str: The pieces of the answer, in order; a fast path answer is yielded at once.
+    """
+    meta = {} if meta is None else meta
+    answer = answer_fast_path(prompt)
+
+    if fast_path_answered(prompt, answer, meta, session):
+        yield answer
+        return
+
+    yield from GPT_conversation_stream(prompt, render_locally, meta, session)
+
+
+async def GPT_conversation_async(prompt: str, render_locally: bool = False, meta: dict = None,
+                                 session: Session = None) -> str:
+    """
+    Answers a natural language availability question, in Italian.
+
+    The first completion lets the model pick and call the availability tools through 
+    'run_tool_calls_async()'; a second completion turns the tool results into the final 
+    answer, unless 'render_locally' is set, in which case the answer is rendered from a 
+    template. Both completions are awaited with the shared async client, so while the 
+    model is thinking the worker is free to serve other requests.
+
+    Args:
+        prompt (str): The user prompt.
+        render_locally (bool): Whether to skip the second completion.
+        meta (dict, optional): Filled with response metadata, see 'run_tool_calls()'.
+        session (Session, optional): The chat session; its history, tool results included, 
+            is sent to the model and the new turn is added to it.
+
+    Returns:
+        str: The answer in natural language.
+    """
+    client = get_async_openai_client()
+    history = session.history() if session is not None else []
+    messages, answer = await run_tool_calls_async(client, prompt, render_locally, meta, history)
+
+    if answer is None:
+        second_response = await client.chat.completions.create(**answer_request(messages))
+        record_usage(second_response.usage, 'answer', meta)
+        answer = second_response.choices[0].message.content
+
+    if session is not None:
+        session.add_turn(conversation_turn(messages[1 + len(history):], answer))
+
+    return answer
+
+
+def GPT_conversation_stream(prompt: str, render_locally: bool = False, meta: dict = None,
+                            session: Session = None):
+    """
+    Streaming variant of 'GPT_conversation_async()', for the worker threads.
+
+    The tool-selecting completion and the tool calls run through 'run_tool_calls()', 
+    then the final completion is requested with 'stream=True' and its tokens are 
+    yielded as soon as they arrive.
+
+    Args:
+        prompt (str): The user prompt.
+        render_locally (bool): Whether to skip the second completion.
+        meta (dict, optional): Filled with response metadata, see 'run_tool_calls()'.
+        session (Session, optional): The chat session, see 'GPT_conversation_async()'.
+
+    Yields:
+        str: The pieces of the answer, in order.
+    """
+    client = get_openai_client()
+    history = session.history() if session is not None else []
+    messages, answer = run_tool_calls(client, prompt, render_locally, meta, history)
+
+    if answer is not None:
+        if answer:
+            yield answer
+        if session is not None:
+            session.add_turn(conversation_turn(messages[1 + len(history):], answer or ''))
+        return
+
+    stream = client.chat.completions.create(
+        **answer_request(messages),
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+
+    pieces = []
+    for chunk in stream:
+        if chunk.usage:
+            record_usage(chunk.usage, 'answer', meta)
+        if chunk.choices and chunk.choices[0].delta.content:
+            pieces.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+
+    if session is not None:
+        session.add_turn(conversation_turn(messages[1 + len(history):], ''.join(pieces)))
 
 
 def check_employee_availability_by_jobtitle(job_title: str, from_date, to_date):
     """
-    Check the availability of an employee within a specified date range.
+    Check the availability of the employees with a job title within a specified date range.
 
     Args:
         job_title (str): The name of the job title to check.
@@ -509,54 +960,24 @@ def check_employee_availability_by_jobtitle(job_title: str, from_date, to_date):
         to_date (str): The end date of the period to check, in YYYY-MM-DD format.
 
     Returns:
-        dict: A dictionary containing:
+        list: A list of dictionaries, one per employee, containing:
             - "name" (str): The name of the employee.
             - "amount_occupied" (str): The percentage of time the employee is occupied.
             - "amount_free" (str): The percentage of time the employee is free.
-
-    Raises:
-        ValueError: If the employee_name is not found.
+        If the job title is not known, a dictionary with an "error" key is returned instead.
 
     Example:
-        >>> check_employee_availability_by_jobtitle("John Doe", "2023-07-01", "2023-07-31")
-        {
+        >>> check_employee_availability_by_jobtitle("designer", "2023-07-01", "2023-07-31")
+        [{
             "name": "John Doe",
             "amount_occupied": "40%",
             "amount_free": "60%"
-        }
+        }]
     """
     job_title = job_title.lower()
     if job_title not in JOB_TITLES:
         return {'error': 'Job title not found.'}
 
     employees = get_employees_by_job_title(job_title)
-    plannings = get_plannings(from_date, to_date)
-
-    availabilities = []
-
-    for employee_id in employees:
-        if str(employee_id) not in plannings['data']['plannings']:
-            # l'id non appare, quindi significa che non esiste alcuna allocazione.
-            # nessuna allocazione significa che la risorsa e' al 100% libera.
-            availabilities.append({
-                "name": get_employee_name_by_id(employee_id),
-                "amount": f'{calculate_load(0, from_date, to_date)}%'
-            })
-        else:
-            # la risorsa non e' libera al 100% perche' appare nelle allocazioni
-            total_amount = 0
-
-            for slot in plannings['data']['plannings'][str(employee_id)]:
-                total_amount = total_amount + slot['amount']
-
-            amount_occupied = int(calculate_load(
-                total_amount, from_date, to_date))
-
-            availabilities.append({
-                "name": get_employee_name_by_id(employee_id),
-                "amount_occupied": f'{amount_occupied}%',
-                "amount_free": f'{100 - amount_occupied}%',
-            })
-
-    return availabilities
 
+    return [availability.to_dict() for availability in compute_availability(employees, from_date, to_date)]
@@ -0,0 +1,295 @@
+import re
+import threading
+from datetime import date, timedelta
+from directory import normalize
+
+MONTHS = {
+    'gennaio': 1, 'febbraio': 2, 'marzo': 3, 'aprile': 4, 'maggio': 5, 'giugno': 6,
+    'luglio': 7, 'agosto': 8, 'settembre': 9, 'ottobre': 10, 'novembre': 11, 'dicembre': 12,
+}
+
+MONTH_NAMES = {number: name for name, number in MONTHS.items()}
+
+AVAILABILITY_WORDS = ('liber', 'disponibil', 'scaric', "chi c'è", 'chi ce', 'bisogno', 'serve')
+
+# questions about who is busy, negated questions and lists of several targets are left to the LLM
+UNSUPPORTED_WORDS = re.compile(r'\b(?:non|nessun\w*|occupat\w*|allocat\w*|impegnat\w*)\b|(?<!\')\b(?:e|ed|o|oppure)\b')
+# range qualifiers the parser does not understand: "la seconda metà di luglio", "dopo il 10 luglio", ...
+# and constraints on the amount of free time: "almeno al 50%", "per 3 giorni", "più di una settimana"
+UNSUPPORTED_QUALIFIERS = re.compile(r'\b(?:metà|meta|dopo|fino|entro|prima|prim[ie]|inizio|fine|ultim\w*|scors\w*|passat\w*'
+                                    r'|ann[oi]|tranne|eccett\w*|esclus\w*|almeno|più|piu|meno|giorn[oi])\b|%')
+
+_MONTH = '(' + '|'.join(MONTHS) + ')'
+_YEAR = r'(?:\s+(?:del\s+)?(\d{4}))?'
+_DAY = r'(\d{1,2})(?:°|º)?'
+
+# any date expression, understood or not, and the start of a "da ... a ..." range
+DATE_WORDS = re.compile(r'\b(?:' + '|'.join(MONTHS) + r'|oggi|domani|dopodomani|ieri|stasera|stamattina'
+                        r'|luned[iì]|marted[iì]|mercoled[iì]|gioved[iì]|venerd[iì]|sabato|domenica|weekend'
+                        r'|settiman\w*|mes[ei]|\d{4})\b|\d{1,2}/\d{1,2}')
+RANGE_START = re.compile(r"\b(?:da|dal|dall'|dalla|dai)(?:\s|(?<=')|$)")
+
+# dal 4 al 10 luglio (2024), dal 28 giugno al 3 luglio (2024)
+RANGE_DAYS = re.compile(r'\b(?:dal|da)\s+' + _DAY + r'(?:\s+' + _MONTH + _YEAR + r')?\s+(?:al|a)\s+' + _DAY + r'\s+' + _MONTH + _YEAR)
+# dal 2024-07-04 al 2024-07-10
+RANGE_ISO = re.compile(r'\b(?:dal|da)\s+(\d{4}-\d{2}-\d{2})\s+(?:al|a)\s+(\d{4}-\d{2}-\d{2})')
+# dal 4/7 al 10/7, dal 4/7/2024 al 10/7/2024
+RANGE_NUMERIC = re.compile(r'\b(?:dal|da)\s+(\d{1,2})/(\d{1,2})(?:/(\d{4}))?\s+(?:al|a)\s+(\d{1,2})/(\d{1,2})(?:/(\d{4}))?')
+# il 12 febbraio, per il 12 febbraio
+SINGLE_DAY = re.compile(r'\b(?:il|l\'|per il)\s*' + _DAY + r'\s+' + _MONTH + _YEAR)
+# a luglio, di luglio, nel mese di luglio, per luglio
+WHOLE_MONTH = re.compile(r'\b(?:a|di|ad|per|nel mese di|in)\s+' + _MONTH + _YEAR)
+
+
+class Intent:
+    def __init__(self, kind, target, from_date, to_date):
+        self.kind = kind
+        self.target = target
+        self.from_date = from_date
+        self.to_date = to_date
+
+    def __repr__(self):
+        return f'Intent({self.kind!r}, {self.target!r}, {self.from_date!r}, {self.to_date!r})'
+
+
+def _date(year: int, month: int, day: int):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _month_bounds(year: int, month: int) -> tuple:
+    first = date(year, month, 1)
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def _roll(start: date, end: date, today: date):
+    # a year-less range that is already over means the next occurrence, as SYSTEM_PROMPT tells the model
+    if start is None or end is None or end >= today:
+        return start, end
+
+    return _date(start.year + 1, start.month, start.day), _date(end.year + 1, end.month, end.day)
+
+
+def parse_date_range(text: str, today: date):
+    """
+    Extracts a date range from an Italian sentence.
+
+    Understands explicit ranges ("dal 4 al 10 luglio", "dal 28 giugno al 3 luglio 2025",
+    "dal 4/7 al 10/7", ISO dates), single days ("il 12 febbraio"), whole months
+    ("a luglio") and relative expressions ("oggi", "domani", "questa settimana",
+    "la prossima settimana", "questo mese", "il mese prossimo"). When no year is
+    given the next occurrence is assumed: the current year, or the next one if the
+    range is already over. Sentences with qualifiers the parser does not understand
+    ("la seconda metà di luglio", "dopo il 10 luglio", "almeno al 50%"), with more than
+    one date expression ("da oggi a venerdì") or with a "da ... a ..." range none of
+    the patterns above matched ("da novembre a dicembre") return None.
+
+    Args:
+        text (str): The sentence, already lowercased.
+        today (date): The reference date for relative expressions and default years.
+
+    Returns:
+        tuple: (from_date, to_date) as 'date' objects, or None if no range is found.
+    """
+    if UNSUPPORTED_QUALIFIERS.search(text):
+        return None
+
+    found = _match_date_range(text, today)
+    if found is None:
+        return None
+
+    date_range, match = found
+    rest = text[:match.start()] + ' ' + text[match.end():]
+
+    # whatever is left must not carry another date, or the start of a range we did not consume
+    if DATE_WORDS.search(rest) or RANGE_START.search(rest):
+        return None
+
+    return date_range
+
+
+def _match_date_range(text: str, today: date):
+    """
+    Finds the first date expression 'parse_date_range()' understands.
+
+    Returns:
+        tuple: (date_range, match), where 'date_range' is None when the expression
+        is not a valid date, or None if no expression is found.
+    """
+    match = RANGE_ISO.search(text)
+    if match:
+        try:
+            return (date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))), match
+        except ValueError:
+            return None, match
+
+    match = RANGE_DAYS.search(text)
+    if match:
+        day_from, month_from, year_from, day_to, month_to, year_to = match.groups()
+        year_to = int(year_to) if year_to else today.year
+        month_to = MONTHS[month_to]
+        month_from = MONTHS[month_from] if month_from else month_to
+        year_from = int(year_from) if year_from else (year_to if month_from <= month_to else year_to - 1)
+        start, end = _date(year_from, month_from, int(day_from)), _date(year_to, month_to, int(day_to))
+        if not match.group(3) and not match.group(6):
+            start, end = _roll(start, end, today)
+        return ((start, end) if start and end else None), match
+
+    match = RANGE_NUMERIC.search(text)
+    if match:
+        day_from, month_from, year_from, day_to, month_to, year_to = match.groups()
+        year_to = int(year_to) if year_to else today.year
+        year_from = int(year_from) if year_from else year_to
+        start = _date(year_from, int(month_from), int(day_from))
+        end = _date(year_to, int(month_to), int(day_to))
+        if not match.group(3) and not match.group(6):
+            start, end = _roll(start, end, today)
+        return ((start, end) if start and end else None), match
+
+    match = SINGLE_DAY.search(text)
+    if match:
+        day, month, year = match.groups()
+        single = _date(int(year) if year else today.year, MONTHS[month], int(day))
+        if not year:
+            single, _ = _roll(single, single, today)
+        return ((single, single) if single else None), match
+
+    match = re.search(r'\boggi\b', text)
+    if match:
+        return (today, today), match
+
+    match = re.search(r'\bdomani\b', text)
+    if match:
+        tomorrow = today + timedelta(days=1)
+        return (tomorrow, tomorrow), match
+
+    monday = today - timedelta(days=today.weekday())
+
+    match = re.search(r'\b(?:prossima settimana|settimana prossima)\b', text)
+    if match:
+        return (monday + timedelta(days=7), monday + timedelta(days=11)), match
+
+    match = re.search(r'\bquesta settimana\b', text)
+    if match:
+        return (monday, monday + timedelta(days=4)), match
+
+    match = re.search(r'\b(?:prossimo mese|mese prossimo)\b', text)
+    if match:
+        next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return _month_bounds(next_month.year, next_month.month), match
+
+    match = re.search(r'\bquesto mese\b', text)
+    if match:
+        return _month_bounds(today.year, today.month), match
+
+    # "la seconda settimana di novembre" and the like are left to the LLM
+    if re.search(r'\bsettiman', text):
+        return None
+
+    match = WHOLE_MONTH.search(text)
+    if match:
+        month, year = match.groups()
+        first, last = _month_bounds(int(year) if year else today.year, MONTHS[month])
+        if not year and last < today:
+            first, last = _month_bounds(today.year + 1, MONTHS[month])
+        return (first, last), match
+
+    return None
+
+
+def _find_terms(text: str, terms) -> list:
+    """
+    Finds the terms occurring in 'text' as whole words (optionally plural with a
+    trailing 's'), longest first, without overlaps.
+
+    Returns:
+        list: (term, start, end) tuples.
+    """
+    found = []
+
+    for term in sorted(terms, key=len, reverse=True):
+        if term not in text:
+            continue
+        for match in re.finditer(r'(?<![\w-])' + re.escape(term) + r's?(?![\w-])', text):
+            if all(match.end() <= start or match.start() >= end for _, start, end in found):
+                found.append((term, match.start(), match.end()))
+
+    return found
+
+
+def parse_intent(prompt: str, today: date, practices: list, job_titles: list, employee_names: list):
+    """
+    Parses an Italian availability question without the LLM.
+
+    The parser is deliberately conservative: it only returns an intent when the
+    prompt is clearly about availability (not about who is busy, and not negated),
+    names exactly one practice, job title or employee and no other group joined to
+    it, and contains a date range it understands.
+
+    Args:
+        prompt (str): The user prompt.
+        today (date): The reference date for relative dates and default years.
+        practices (list): Known practice names, lowercase.
+        job_titles (list): Known job titles, lowercase.
+        employee_names (list): Known employee full names, normalized.
+
+    Returns:
+        Intent: The parsed intent, or None when the parser is not confident.
+    """
+    text = normalize(prompt.replace('’', "'"))
+
+    if not any(word in text for word in AVAILABILITY_WORDS) or UNSUPPORTED_WORDS.search(text):
+        return None
+
+    date_range = parse_date_range(text, today)
+    if date_range is None or date_range[0] > date_range[1]:
+        return None
+
+    employees = _find_terms(text, employee_names)
+    taken = employees[:]
+    titles = [t for t in _find_terms(text, job_titles)
+              if all(t[2] <= start or t[1] >= end for _, start, end in taken)]
+    taken += titles
+    practices = [p for p in _find_terms(text, practices)
+                 if all(p[2] <= start or p[1] >= end for _, start, end in taken)]
+
+    targets = ([('employee', term) for term, _, _ in employees] +
+               [('job_title', term) for term, _, _ in titles] +
+               [('practice', term) for term, _, _ in practices])
+
+    if len(set(targets)) != 1:
+        return None
+
+    kind, target = targets[0]
+
+    return Intent(kind, target, date_range[0].isoformat(), date_range[1].isoformat())
+
+
+class FastPathStats:
+    """
+    Thread-safe hit/miss counters of the deterministic fast path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total, 4) if total else 0,
+            }
@@ -0,0 +1,60 @@
+import os
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from per_process import per_process
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.environ.get('OPENAI_TIMEOUT') or 60),
+        connect=float(os.environ.get('OPENAI_CONNECT_TIMEOUT') or 5),
+    )
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.environ.get('OPENAI_MAX_CONNECTIONS') or 20),
+        max_keepalive_connections=int(os.environ.get('OPENAI_MAX_KEEPALIVE') or 10),
+        keepalive_expiry=float(os.environ.get('OPENAI_KEEPALIVE_EXPIRY') or 60),
+    )
+
+
+@per_process
+def get_openai_client() -> OpenAI:
+    """
+    Returns the per-process OpenAI client, creating it on first use.
+
+    The client owns a keep-alive 'httpx' connection pool with explicit limits and
+    timeouts, and is reused across requests and across the completion calls of a
+    conversation. It is rebuilt when the current PID differs from the one that
+    created it, so pooled connections are never shared between forked gunicorn workers.
+
+    Returns:
+        OpenAI: The shared client for this process.
+    """
+    timeout = _timeout()
+    return OpenAI(
+        timeout=timeout,
+        max_retries=int(os.environ.get('OPENAI_MAX_RETRIES') or 2),
+        http_client=httpx.Client(timeout=timeout, limits=_limits()),
+    )
+
+
+@per_process
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Returns the per-process async OpenAI client, creating it on first use.
+
+    Same pool limits and timeouts as 'get_openai_client()'. The client must only be
+    awaited on the background event loop of 'aio.get_event_loop()', which owns its
+    connections; like the loop, it is rebuilt after a fork.
+
+    Returns:
+        AsyncOpenAI: The shared async client for this process.
+    """
+    timeout = _timeout()
+    return AsyncOpenAI(
+        timeout=timeout,
+        max_retries=int(os.environ.get('OPENAI_MAX_RETRIES') or 2),
+        http_client=httpx.AsyncClient(timeout=timeout, limits=_limits()),
+    )
@@ -1,15 +1,60 @@
+import json
+import logging
+import os
+import re
 import uuid
+from datetime import date
 from pathlib import Path
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, render_template
-from functions import check_availability, check_employee_availability, GPT_conversation
+from flask import Flask, Response, request, jsonify, render_template, send_file, stream_with_context
+from functions import check_availability, check_employee_availability, check_availability_batch, answer_question_stream, answer_question_async, planning_cache, upstream_flight, roster, caches, fast_path_stats
 
-from audio import elevenlalbs
+from aio import run
+from audio import stream_tts
+from audio_store import AudioStore
+from tts_cache import TTSCache
+from tts_jobs import TTSJobs
+from speech import speak_while_generating
+from upstream import get_upstream_client
+from sessions import SessionStore
 load_dotenv()
 
+logging.basicConfig(level=os.environ.get('LOG_LEVEL') or 'INFO')
+
 app = Flask(__name__)
 
+SESSION_COOKIE = 'chatod_session'
+
+sessions = SessionStore(
+    ttl=int(os.environ.get('SESSION_TTL') or 1800),
+    max_sessions=int(os.environ.get('SESSION_MAX_SESSIONS') or 1000),
+    max_turns=int(os.environ.get('SESSION_MAX_TURNS') or 10),
+    max_bytes=int(os.environ.get('SESSION_MAX_BYTES') or 65536),
+    # shared by the workers, so every turn sees the whole history
+    folder=os.environ.get('SESSION_DIR') or '.sessions',
+)
+
+audio_store = AudioStore(
+    folder=os.environ.get('AUDIO_STORE_DIR') or 'static/audio',
+    max_bytes=int(os.environ.get('AUDIO_STORE_MAX_BYTES') or 256 * 1024 * 1024),
+    max_age=int(os.environ.get('AUDIO_STORE_MAX_AGE') or 7 * 24 * 3600),
+    sweep_interval=int(os.environ.get('AUDIO_STORE_SWEEP_INTERVAL') or 60),
+)
+
+tts_cache = TTSCache(audio_store)
+
+tts_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('TTS_WORKERS') or 4), thread_name_prefix='tts')
+
+tts_jobs = TTSJobs(
+    lambda text: '/' + tts_cache.synthesize(text),
+    workers=int(os.environ.get('TTS_JOB_WORKERS') or 2),
+    ttl=int(os.environ.get('TTS_JOB_TTL') or 600),
+    # job statuses are shared with the other workers next to the downloads
+    folder=tts_cache.tmp_folder,
+)
+
 
 @app.route('/')
 def index():
@@ -50,17 +95,260 @@ def availability():
         return jsonify({'error': str(e)}), 500
 
 
+def is_iso_date(value) -> bool:
+    """
+    Tells whether 'value' is a valid date string in 'YYYY-MM-DD' format.
+    """
+    if not isinstance(value, str) or not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        return False
+
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+
+    return True
+
+
+@app.route('/availability/batch', methods=['POST'])
+def availability_batch():
+    try:
+        payload = request.get_json(silent=True) or {}
+        selectors = payload.get('selectors')
+        ranges = payload.get('ranges')
+
+        # Check if any parameter is missing
+        if not selectors or not ranges or not isinstance(selectors, list) or not isinstance(ranges, list):
+            return jsonify({'error': 'Parameters selectors and ranges are mandatory lists.'}), 422
+
+        max_queries = int(os.environ.get('BATCH_MAX_QUERIES') or 200)
+        if len(selectors) * len(ranges) > max_queries:
+            return jsonify({'error': f'A batch can evaluate at most {max_queries} selector and range pairs.'}), 422
+
+        for date_range in ranges:
+            if not isinstance(date_range, dict) or not is_iso_date(date_range.get('from_date')) \
+                    or not is_iso_date(date_range.get('to_date')):
+                return jsonify({'error': 'Every range must specify from_date and to_date in YYYY-MM-DD format.'}), 422
+
+        for selector in selectors:
+            values = [selector[key] for key in ('practice', 'employee', 'job_title') if key in selector] \
+                if isinstance(selector, dict) else []
+            if len(values) != 1 or not isinstance(values[0], str) or not values[0].strip():
+                return jsonify({'error': 'Every selector must specify exactly one of practice, employee or job_title, as a non-empty string.'}), 422
+
+        return jsonify({'results': check_availability_batch(selectors, ranges)})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/metrics')
+def metrics():
+    return jsonify({
+        'upstream': get_upstream_client().stats(),
+        'roster': roster.stats(),
+        'caches': caches.stats(),
+        'fast_path': fast_path_stats.stats(),
+        'planning_cache': planning_cache.stats(),
+        'singleflight': upstream_flight.stats(),
+        'sessions': sessions.stats(),
+        'tts_cache': tts_cache.stats(),
+        'audio_store': audio_store.stats(),
+        'tts_jobs': tts_jobs.stats(),
+    })
+
+
+def current_session():
+    """
+    Returns the chat session of the request, from the 'session' parameter or the session cookie.
+    """
+    return sessions.get(request.args.get('session') or request.cookies.get(SESSION_COOKIE))
+
+
+def set_session_cookie(response, session):
+    response.set_cookie(SESSION_COOKIE, session.id, max_age=sessions.ttl, httponly=True, samesite='Lax')
+    return response
+
+
+def render_locally(render: str) -> bool:
+    """
+    Tells whether the final answer is rendered locally ('render=local') or by the LLM 
+    ('render=llm'); without the parameter the 'ANSWER_RENDERER' default applies.
+    """
+    return (render or os.environ.get('ANSWER_RENDERER') or 'llm') == 'local'
+
+
+async def voice_answer(prompt: str, local: bool, meta: dict, session) -> tuple:
+    """
+    The /testgpt pipeline: answers the question and synthesizes the answer, awaiting 
+    every network call on the shared event loop.
+
+    Returns:
+        tuple: (answer, path of the MP3 file).
+    """
+    res = await answer_question_async(prompt, local, meta, session)
+    speech_file_path = await tts_cache.synthesize_async(res)
+
+    return res, speech_file_path
+
+
+def audio_mode(audio: str) -> str:
+    """
+    Tells how the answer audio is delivered: synthesized to a file before responding 
+    ('audio=file'), streamed through '/audio/stream' ('audio=stream'), synthesized by a 
+    background job the client polls ('audio=job') or, on '/testgpt/stream' only, 
+    synthesized sentence by sentence while the answer is generated ('audio=segments'); 
+    without the parameter the 'AUDIO_MODE' default applies.
+    """
+    return audio or os.environ.get('AUDIO_MODE') or 'file'
+
+
+def audio_stream_url(text: str) -> str:
+    # only the key travels in the URL, answers can be longer than a request line
+    return '/audio/stream?' + urlencode({'key': tts_cache.remember(text)})
+
+
+@app.route('/audio/stream')
+def audio_stream():
+    """
+    Synthesizes the text saved under 'key' by 'audio_stream_url()' and proxies the MP3 
+    to the client while ElevenLabs produces it, so playback starts with the first chunk. 
+    The stream is also saved in the TTS cache, and an answer already in the cache is sent 
+    straight from disk; the path of the cached file is in the 'X-Audio-Path' header.
+    """
+    key = request.args.get('key', type=str)
+    if not key or not re.fullmatch(r'[0-9a-f]{64}', key):
+        return jsonify({'error': 'a valid key is required'}), 422
+
+    cached_path = tts_cache.lookup_key(key)
+    if cached_path:
+        response = send_file(os.path.abspath(cached_path), mimetype='audio/mpeg', conditional=True)
+        response.headers['X-Audio-Path'] = '/' + cached_path
+        return response
+
+    text = tts_cache.recall(key)
+    if text is None:
+        return jsonify({'error': 'unknown key'}), 404
+
+    tee_path = tts_cache.path(key)
+
+    try:
+        chunks = stream_tts(text, tee_path, on_complete=tts_cache.add)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 502
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', 'X-Audio-Path': '/' + tee_path}
+
+    return Response(stream_with_context(chunks), mimetype='audio/mpeg', headers=headers)
+
+
+def submit_tts_job(text: str) -> dict:
+    """
+    Queues the synthesis of 'text' and returns the job with the URLs to follow it. 
+    The job id is the TTS cache key, so identical answers share one job.
+    """
+    job = tts_jobs.submit(tts_cache.key(text), text).to_dict()
+    job['url'] = f"/audio/jobs/{job['id']}"
+    job['events'] = f"/audio/jobs/{job['id']}/events"
+
+    return job
+
+
+def tts_job_state(job_id: str) -> dict:
+    """
+    Returns the state of a TTS job, or None if no worker knows it.
+
+    Jobs live in the process that runs them. A job unknown to this worker is looked 
+    up in the TTS cache, where its MP3 is stored once done, then in the statuses the 
+    workers share through 'tts_jobs.shared()', which keep a job pending, running or 
+    failed for 'TTS_JOB_TTL' seconds. Ids no worker recorded are unknown.
+    """
+    job = tts_jobs.get(job_id)
+    if job is not None:
+        return job.to_dict()
+
+    if not re.fullmatch(r'[0-9a-f]{64}', job_id):
+        return None
+
+    path = tts_cache.lookup_key(job_id, count=False)
+    if path is not None:
+        return {'id': job_id, 'status': 'done', 'mp3': '/' + path, 'error': None}
+
+    state = tts_jobs.shared(job_id)
+    if state is None or state['status'] == 'done':
+        # a done job without its MP3 was evicted from the cache
+        return None
+
+    return state
+
+
+@app.route('/audio/jobs/<job_id>')
+def audio_job(job_id):
+    job = tts_job_state(job_id)
+    if job is None:
+        return jsonify({'error': 'unknown job'}), 404
+
+    return jsonify(job), 202 if job['status'] in ('pending', 'running') else 200
+
+
+@app.route('/audio/jobs/<job_id>/events')
+def audio_job_events(job_id):
+    """
+    Pushes a single 'ready' (or 'failed') event when the TTS job is over, instead of polling.
+
+    Only the worker running the job can wait for it. Any other worker answers at once 
+    with a 'pending' event and a 'retry' delay, after which the browser's EventSource 
+    reconnects by itself, so no thread is held while the job runs elsewhere.
+    """
+    job = tts_jobs.get(job_id)
+    state = job.to_dict() if job is not None else tts_job_state(job_id)
+    if state is None:
+        return jsonify({'error': 'unknown job'}), 404
+
+    def generate():
+        if job is None:
+            if state['status'] in ('pending', 'running'):
+                yield f"retry: {int(os.environ.get('TTS_JOB_RETRY_MS') or 1000)}\n\n"
+                yield sse('pending', state)
+            else:
+                yield sse('ready' if state['status'] == 'done' else 'failed', state)
+            return
+
+        if not job.done.wait(float(os.environ.get('TTS_JOB_TIMEOUT') or 120)):
+            yield sse('timeout', job.to_dict())
+        else:
+            yield sse('ready' if job.status == 'done' else 'failed', job.to_dict())
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
 @app.route('/testgpt')
 def testgpt():
-    client = OpenAI()
-
     try:
         prompt = request.args.get(
             'prompt', default="chi c'è della practice technology libero dal 4 al 10 luglio ?", type=str)
 
-        res = GPT_conversation(prompt)
+        meta = {}
+        session = current_session()
+        local = render_locally(request.args.get('render'))
 
-        speech_file_path = elevenlalbs(res, 'static/audio')
+        mode = audio_mode(request.args.get('audio'))
+        job = None
+
+        if mode == 'stream':
+            res = run(answer_question_async(prompt, local, meta, session))
+            mp3 = audio_stream_url(res)
+        elif mode == 'job':
+            # the text is returned at once, the audio is announced by the job
+            res = run(answer_question_async(prompt, local, meta, session))
+            mp3 = None
+            job = submit_tts_job(res)
+        else:
+            res, speech_file_path = run(voice_answer(prompt, local, meta, session))
+            mp3 = ''.join(['/', speech_file_path])
         
         # with client.audio.speech.with_streaming_response.create(
         #     model="tts-1",
@@ -77,11 +365,70 @@ def testgpt():
         #     speech_file_path = f"static/audio/{id}.mp3"
         #     response.stream_to_file(speech_file_path)
 
-        return jsonify({'txt': res, 'mp3': ''.join(['/', speech_file_path])})
+        return set_session_cookie(
+            jsonify({'txt': res, 'mp3': mp3, 'job': job, 'meta': meta, 'session': session.id}),
+            session)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def sse(event: str, data) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+@app.route('/testgpt/stream')
+def testgpt_stream():
+    prompt = request.args.get(
+        'prompt', default="chi c'è della practice technology libero dal 4 al 10 luglio ?", type=str)
+
+    local = render_locally(request.args.get('render'))
+    mode = audio_mode(request.args.get('audio'))
+    session = current_session()
+
+    def generate():
+        try:
+            tokens = []
+            meta = {}
+
+            answer = answer_question_stream(prompt, local, meta, session)
+
+            if mode == 'segments':
+                # audio segments are sent as 'audio' events while the answer is generated
+                events = speak_while_generating(
+                    answer, lambda sentence: '/' + tts_cache.synthesize(sentence), tts_executor,
+                    min_chars=int(os.environ.get('TTS_SEGMENT_MIN_CHARS') or 20))
+            else:
+                events = (('token', token) for token in answer)
+
+            for event, data in events:
+                if event == 'token':
+                    tokens.append(data)
+                yield sse(event, data)
+
+            res = ''.join(tokens)
+            job = None
+
+            if mode == 'segments':
+                mp3 = None
+            elif mode == 'job':
+                mp3 = None
+                job = submit_tts_job(res)
+            elif mode == 'stream':
+                mp3 = audio_stream_url(res)
+            else:
+                mp3 = ''.join(['/', tts_cache.synthesize(res)])
+
+            yield sse('done', {'txt': res, 'mp3': mp3, 'job': job, 'meta': meta, 'session': session.id})
+
+        except Exception as e:
+            yield sse('error', {'error': str(e)})
+
+    return set_session_cookie(Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    }), session)
+
+
 if __name__ == "__main__":
     app.run()
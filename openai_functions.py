@@ -90,3 +90,20 @@ openai_func_check_employee_availability = {
         },
     },
 }
+
+# the tools and the system prompt never change: together they form a byte-stable prompt
+# prefix that the provider can cache across requests and across the two completions
+TOOLS = [
+    openai_func_check_availability,
+    openai_func_check_employee_availability,
+    openai_func_check_availability_by_job_title
+]
+
+SYSTEM_PROMPT = (
+    "Sei l'assistente di Chatod e rispondi a domande sulla disponibilità dei colleghi. "
+    "Usa le funzioni a disposizione per verificare la disponibilità di una practice, di un ruolo o di una persona. "
+    "Se non viene specificato l'anno, intendi la prossima occorrenza del periodo rispetto alla data di oggi indicata alla fine della domanda: "
+    "l'anno di oggi, oppure l'anno successivo se il periodo è già interamente passato. "
+    "Rispondi fornendo la risposta in linguaggio naturale senza aggiungere domande o ulteriori dettagli. "
+    "Rispondi sempre in italiano."
+)
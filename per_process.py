@@ -0,0 +1,42 @@
+import functools
+import os
+import threading
+
+
+def per_process(factory):
+    """
+    Turns 'factory' into a getter of a lazily created, per-process instance.
+
+    The instance is created on first use and shared by every thread of the process.
+    It is created again when the current PID differs from the one that created it,
+    so connection pools, sockets and threads are never shared between forked
+    gunicorn workers. Usable as a decorator.
+
+    Args:
+        factory (callable): Function without arguments building the instance.
+
+    Returns:
+        callable: The getter, with the name and docstring of 'factory'.
+    """
+    state = {'pid': None, 'instance': None, 'lock': threading.Lock()}
+
+    def reset_lock():
+        # a lock held by another thread at fork time would stay held forever in the child
+        state['lock'] = threading.Lock()
+
+    os.register_at_fork(after_in_child=reset_lock)
+
+    @functools.wraps(factory)
+    def get():
+        pid = os.getpid()
+        if state['pid'] == pid:
+            return state['instance']
+
+        with state['lock']:
+            if state['pid'] != pid:
+                state['instance'] = factory()
+                state['pid'] = pid
+
+        return state['instance']
+
+    return get
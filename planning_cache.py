@@ -0,0 +1,218 @@
+import threading
+from datetime import date, timedelta
+from cachetools import TTLCache
+
+
+def window_start(day: date, window: str) -> date:
+    """
+    Returns the first day of the aligned window containing 'day'.
+
+    Args:
+        day (date): Any day inside the window.
+        window (str): Either 'week' (ISO weeks, Monday to Sunday) or 'month'.
+
+    Returns:
+        date: The Monday of the ISO week, or the first day of the month.
+    """
+    if window == 'month':
+        return day.replace(day=1)
+
+    return day - timedelta(days=day.weekday())
+
+
+def window_end(start: date, window: str) -> date:
+    """
+    Returns the last day of the aligned window starting on 'start'.
+
+    Args:
+        start (date): The first day of the window, as returned by 'window_start()'.
+        window (str): Either 'week' or 'month'.
+
+    Returns:
+        date: The Sunday of the ISO week, or the last day of the month.
+    """
+    if window == 'month':
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+
+    return start + timedelta(days=6)
+
+
+class PlanningCache:
+    """
+    Interval-aware cache for planningboard data.
+
+    Plannings are fetched and stored in aligned windows (whole ISO weeks or whole
+    months). A request for any date range is answered from the cached windows that
+    cover it, filtering slots by date, and only the missing windows are fetched
+    from upstream. Contiguous missing windows are fetched with a single request.
+
+    Every slot is expected to carry a 'date' attribute ('YYYY-MM-DD'); the first
+    time the upstream returns slots without it the cache switches to passthrough
+    mode for good, and every request is then forwarded uncached with its exact range.
+    """
+
+    def __init__(self, fetch, window: str = 'week', ttl: int = 60, maxsize: int = 256):
+        """
+        Args:
+            fetch (callable): Function taking ('from_date', 'to_date') strings and
+                returning the raw planningboard response.
+            window (str): Window alignment, either 'week' or 'month'.
+            ttl (int): Seconds a fetched window stays valid.
+            maxsize (int): Maximum number of windows kept in memory.
+        """
+        if window not in ('week', 'month'):
+            raise ValueError(f'Unsupported planning window: {window}')
+
+        self._fetch = fetch
+        self.window = window
+        self._windows = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._fetches = 0
+        self._passthrough = 0
+        self._dateless = False
+
+    def get(self, from_date: str, to_date: str) -> dict:
+        """
+        Returns planning data for the given date range, inclusive of boundaries.
+
+        Args:
+            from_date (str): The start date in 'YYYY-MM-DD' format.
+            to_date (str): The end date in 'YYYY-MM-DD' format.
+
+        Returns:
+            dict: A dictionary shaped like the planningboard response,
+            i.e. {'data': {'plannings': {'<employee_id>': [slot, ...]}}}.
+        """
+        start = date.fromisoformat(from_date)
+        end = date.fromisoformat(to_date)
+
+        if start > end:
+            return {'data': {'plannings': {}}}
+
+        windows = None if self._dateless else self._load_windows(start, end)
+
+        if windows is None:
+            with self._lock:
+                self._passthrough += 1
+            return self._fetch(from_date, to_date)
+
+        plannings = {}
+        for key in sorted(windows):
+            for employee_id, slots in windows[key].items():
+                for slot in slots:
+                    if from_date <= slot['date'][:10] <= to_date:
+                        plannings.setdefault(employee_id, []).append(slot)
+
+        return {'data': {'plannings': plannings}}
+
+    def prefetch(self, from_date: str, to_date: str):
+        """
+        Makes sure every window covering the given date range is cached.
+
+        Args:
+            from_date (str): The start date in 'YYYY-MM-DD' format.
+            to_date (str): The end date in 'YYYY-MM-DD' format.
+        """
+        start = date.fromisoformat(from_date)
+        end = date.fromisoformat(to_date)
+
+        if start <= end and not self._dateless:
+            self._load_windows(start, end)
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'window': self.window,
+                'windows': len(self._windows),
+                'hits': self._hits,
+                'misses': self._misses,
+                'fetches': self._fetches,
+                'passthrough': self._passthrough,
+                'passthrough_mode': self._dateless,
+            }
+
+    def _load_windows(self, start: date, end: date):
+        """
+        Collects the windows covering [start, end], fetching the missing ones.
+
+        Returns:
+            dict: Window start -> {employee_id: [slot, ...]}, or None when the
+            upstream data cannot be split into windows.
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            current = window_start(start, self.window)
+            while current <= end:
+                cached = self._windows.get(current)
+                if cached is None:
+                    missing.append(current)
+                    self._misses += 1
+                else:
+                    found[current] = cached
+                    self._hits += 1
+                current = window_end(current, self.window) + timedelta(days=1)
+
+        for run_start, run_end in self._runs(missing):
+            fetched = self._fetch_run(run_start, run_end)
+            if fetched is None:
+                return None
+            found.update(fetched)
+
+        return found
+
+    def _runs(self, starts: list):
+        """
+        Groups sorted window starts into runs of contiguous windows.
+
+        Yields:
+            tuple: (first day of the run, last day of the run).
+        """
+        run_start = run_end = None
+
+        for start in starts:
+            if run_end is not None and start == run_end + timedelta(days=1):
+                run_end = window_end(start, self.window)
+                continue
+            if run_start is not None:
+                yield run_start, run_end
+            run_start, run_end = start, window_end(start, self.window)
+
+        if run_start is not None:
+            yield run_start, run_end
+
+    def _fetch_run(self, run_start: date, run_end: date):
+        response = self._fetch(run_start.isoformat(), run_end.isoformat())
+
+        with self._lock:
+            self._fetches += 1
+
+        windows = {}
+        current = run_start
+        while current <= run_end:
+            windows[current] = {}
+            current = window_end(current, self.window) + timedelta(days=1)
+
+        for employee_id, slots in (response['data']['plannings'] or {}).items():
+            for slot in slots:
+                if not slot.get('date'):
+                    # the slots cannot be split into windows, stop trying
+                    self._dateless = True
+                    return None
+                key = window_start(date.fromisoformat(slot['date'][:10]), self.window)
+                if key in windows:
+                    windows[key].setdefault(employee_id, []).append(slot)
+
+        with self._lock:
+            for key, value in windows.items():
+                self._windows[key] = value
+
+        return windows
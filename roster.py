@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+
+class RosterProvider:
+    """
+    Stale-while-revalidate holder for the employee roster.
+
+    Once a roster has been fetched it is always served from memory. When it is
+    older than 'soft_ttl' a single background thread refreshes it while callers
+    keep getting the last good copy. Only a roster older than 'hard_ttl' (e.g.
+    after a long idle period) is refreshed inline. If the upstream is failing,
+    the last good copy keeps being served and refreshes are retried at most once
+    every 'soft_ttl' seconds.
+
+    An optional 'build' function derives an index from every fetched roster; it
+    runs once per fetch and is swapped in together with the roster it was built from.
+    """
+
+    def __init__(self, fetch, soft_ttl: float, hard_ttl: float, build=None):
+        """
+        Args:
+            fetch (callable): Function without arguments returning the roster.
+            soft_ttl (float): Age in seconds after which a background refresh starts.
+            hard_ttl (float): Age in seconds after which callers wait for a refresh.
+            build (callable, optional): Function deriving an index from a roster.
+        """
+        self._fetch = fetch
+        self._build = build
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+
+        self._lock = threading.Lock()
+        self._data = None
+        self._index = None
+        self._fetched_at = 0.0
+        self._next_refresh = 0.0
+        self._refreshing = False
+        self._version = 0
+        self._refreshes = 0
+        self._failures = 0
+        self._last_error = None
+
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def version(self) -> int:
+        """
+        Monotonic counter bumped every time a new roster is stored.
+        """
+        return self._version
+
+    def get(self) -> dict:
+        """
+        Returns the current roster, refreshing it when needed.
+
+        Returns:
+            dict: The roster as returned by the upstream API.
+
+        Raises:
+            Exception: Whatever the fetch raised, only when no roster has ever been loaded.
+        """
+        now = time.monotonic()
+        data = self._data
+        age = now - self._fetched_at
+
+        if data is None or (age >= self.hard_ttl and now >= self._next_refresh):
+            return self._refresh_inline()
+
+        if age >= self.soft_ttl and now >= self._next_refresh:
+            self._refresh_in_background()
+
+        return data
+
+    def index(self):
+        """
+        Returns the index built by 'build' from the current roster.
+        """
+        self.get()
+        return self._index
+
+    def warm(self):
+        """
+        Starts loading the roster in the background if it is missing or stale.
+        """
+        now = time.monotonic()
+
+        if self._data is None or (now - self._fetched_at >= self.soft_ttl and now >= self._next_refresh):
+            self._refresh_in_background()
+
+    def stats(self) -> dict:
+        return {
+            'version': self._version,
+            'age': round(time.monotonic() - self._fetched_at, 3) if self._data is not None else None,
+            'refreshing': self._refreshing,
+            'refreshes': self._refreshes,
+            'failures': self._failures,
+            'last_error': self._last_error,
+        }
+
+    def _refresh_inline(self) -> dict:
+        try:
+            return self._load()
+        except Exception:
+            if self._data is None:
+                raise
+            return self._data
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(target=self._background, name='roster-refresh', daemon=True)
+        thread.start()
+
+    def _background(self):
+        try:
+            self._load()
+        except Exception:
+            pass
+        finally:
+            self._refreshing = False
+
+    def _load(self) -> dict:
+        try:
+            data = self._fetch()
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+                self._last_error = str(e)
+                self._next_refresh = time.monotonic() + self.soft_ttl
+            raise
+
+        index = self._build(data) if self._build else None
+
+        with self._lock:
+            self._data = data
+            self._index = index
+            self._fetched_at = time.monotonic()
+            self._next_refresh = self._fetched_at + self.soft_ttl
+            self._version += 1
+            self._refreshes += 1
+            self._last_error = None
+
+        return data
+
+    def _after_fork(self):
+        # the refresh thread does not survive fork, neither must its flag
+        self._lock = threading.Lock()
+        self._refreshing = False
@@ -0,0 +1,242 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from pathlib import Path
+
+SESSION_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class Session:
+    """
+    Bounded conversation history of a single chat user.
+
+    The history is kept as whole turns (the user message, the assistant tool calls,
+    the tool results and the final answer), so trimming never leaves a tool call
+    without its result. The oldest turns are dropped when the session holds more
+    than 'max_turns' turns or more than 'max_bytes' bytes of serialized messages.
+
+    When the session has a 'path' every new turn is also written there, so the
+    other worker processes can read the whole history.
+    """
+
+    def __init__(self, session_id: str, max_turns: int, max_bytes: int, path: str = None):
+        self.id = session_id
+        self.max_turns = max_turns
+        self.max_bytes = max_bytes
+        self.path = path
+        self.last_seen = time.monotonic()
+        self.size = 0
+        # modification time and size of the file this copy was last read from or written to
+        self.version = None
+        self._turns = deque()
+        self._lock = threading.Lock()
+
+    def history(self) -> list:
+        """
+        Returns the messages of every stored turn, oldest first.
+        """
+        with self._lock:
+            return [message for turn, _ in self._turns for message in turn]
+
+    def add_turn(self, messages: list):
+        """
+        Appends a turn to the history, dropping the oldest turns beyond the caps.
+
+        Args:
+            messages (list): The messages of the turn, as plain dictionaries.
+        """
+        with self._lock:
+            self._append(messages)
+            if self.path:
+                self._save()
+
+    def _append(self, messages: list):
+        size = len(json.dumps(messages, default=str))
+        self._turns.append((messages, size))
+        self.size += size
+
+        while self._turns and (len(self._turns) > self.max_turns or self.size > self.max_bytes):
+            _, dropped = self._turns.popleft()
+            self.size -= dropped
+
+    def _save(self):
+        part = f'{self.path}.{uuid.uuid4().hex}.part'
+        with open(part, 'w', encoding='utf-8') as f:
+            json.dump([turn for turn, _ in self._turns], f, default=str)
+        os.replace(part, self.path)
+        stat = os.stat(self.path)
+        self.version = (stat.st_mtime_ns, stat.st_size)
+
+    def __len__(self):
+        return len(self._turns)
+
+
+class SessionStore:
+    """
+    Store of chat sessions.
+
+    Sessions expire after 'ttl' seconds of inactivity and, when more than
+    'max_sessions' are alive in the process, the least recently used ones are
+    evicted from memory.
+
+    With a 'folder', shared by the gunicorn workers, every session is also kept
+    there as one JSON file per id and each request reloads the file when another
+    worker wrote to it since, so a conversation keeps its whole history whichever
+    worker serves the next turn. Concurrent turns of the same session are not
+    merged: the last one written wins. Without a folder the sessions live in the
+    process only, and a request served by another worker finds no history.
+    """
+
+    def __init__(self, ttl: float = 1800, max_sessions: int = 1000, max_turns: int = 10,
+                 max_bytes: int = 65536, folder: str = None, sweep_interval: float = 60):
+        """
+        Args:
+            ttl (float): Seconds of inactivity after which a session expires.
+            max_sessions (int): Maximum number of sessions kept in memory.
+            max_turns (int): Maximum number of turns of a session.
+            max_bytes (int): Maximum size of the serialized turns of a session.
+            folder (str, optional): The folder shared by the workers, created if missing.
+            sweep_interval (float): Seconds between two sweeps of the expired files.
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_bytes = max_bytes
+        self.folder = folder
+        self.sweep_interval = sweep_interval
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+        self._reloads = 0
+        self._last_sweep = 0
+
+        if folder:
+            Path(folder).mkdir(parents=True, exist_ok=True)
+
+    def get(self, session_id: str = None) -> Session:
+        """
+        Returns the session with the given id, or a new one if it is unknown or expired.
+
+        A new session keeps the id sent by the client when it is well-formed, so
+        sessions started by other workers are not given a different id.
+
+        Args:
+            session_id (str, optional): The id sent by the client, e.g. from a cookie.
+
+        Returns:
+            Session: The live session, marked as just used.
+        """
+        now = time.monotonic()
+
+        if not (session_id and SESSION_ID.fullmatch(session_id)):
+            session_id = None
+
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id) if session_id else None
+            sweep = self.folder and now - self._last_sweep >= self.sweep_interval
+            if sweep:
+                self._last_sweep = now
+
+        if sweep:
+            self._sweep()
+
+        if self.folder and session_id:
+            session = self._load(session_id, session)
+
+        with self._lock:
+            if session is None:
+                session_id = session_id or uuid.uuid4().hex
+                session = Session(session_id, self.max_turns, self.max_bytes, self.path(session_id))
+
+            session.last_seen = now
+            self._sessions[session.id] = session
+            self._sessions.move_to_end(session.id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evictions += 1
+
+        return session
+
+    def path(self, session_id: str) -> str:
+        return f'{self.folder}/{session_id}.json' if self.folder else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'bytes': sum(session.size for session in self._sessions.values()),
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'reloads': self._reloads,
+                'shared': bool(self.folder),
+            }
+
+    def _load(self, session_id: str, cached: Session):
+        """
+        Returns the session as last written by any worker, reusing 'cached' when
+        its file did not change, or None if the file is missing or expired.
+        """
+        path = self.path(session_id)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # a copy that was never saved has no turns yet; a saved one was expired elsewhere
+            return cached if cached is not None and cached.version is None else None
+
+        if time.time() - stat.st_mtime > self.ttl:
+            self._remove(path)
+            return None
+
+        if cached is not None and cached.version == (stat.st_mtime_ns, stat.st_size):
+            return cached
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                turns = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        session = Session(session_id, self.max_turns, self.max_bytes, path)
+        for turn in turns:
+            session._append(turn)
+        session.version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            self._reloads += 1
+
+        return session
+
+    def _expire(self, now: float):
+        # sessions are kept in last-use order, so the expired ones are at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_seen < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self._expirations += 1
+
+    def _sweep(self):
+        # deletes the files of the sessions no worker used for 'ttl' seconds
+        deadline = time.time() - self.ttl
+
+        for entry in os.scandir(self.folder):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
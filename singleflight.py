@@ -0,0 +1,75 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share the same key.
+
+    The first caller for a key runs the function; every caller that arrives while
+    that call is still in flight waits for it and receives the same result (or the
+    same exception) instead of running the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executed = 0
+        self._deduplicated = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs 'fn(*args, **kwargs)' unless a call with the same key is already in flight.
+
+        Args:
+            key: Any hashable value identifying the call.
+            fn (callable): The function to run.
+
+        Returns:
+            The value returned by the single in-flight call.
+
+        Raises:
+            Exception: Whatever the in-flight call raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._deduplicated += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executed': self._executed,
+                'deduplicated': self._deduplicated,
+            }
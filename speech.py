@@ -0,0 +1,117 @@
+import re
+from collections import deque
+
+# Italian abbreviations whose trailing dot does not end a sentence
+ABBREVIATIONS = {
+    'es', 'ecc', 'sig', 'sigg', 'sig.ra', 'dott', 'dott.ssa', 'dr', 'prof', 'ing', 'avv',
+    'arch', 'geom', 'rag', 'p', 'pag', 'pagg', 'n', 'nr', 'art', 'tel', 'ca', 'cfr', 'vs',
+}
+
+# a run of terminators, optional closing quotes or brackets, then whitespace
+BOUNDARY = re.compile(r'(?:\.{3}|[.!?…;]+|\n)["»”)\]]*(?=\s)')
+
+
+class SentenceSplitter:
+    """
+    Splits text arriving in pieces (e.g. LLM tokens) into sentences.
+
+    A sentence is complete when its terminator ('.', '!', '?', '…', ';' or a
+    newline) is followed by whitespace, so "70.5%" or a dot still waiting for the
+    next token never split early, and dots after common Italian abbreviations
+    ("es.", "ecc.", "dott.") are ignored. Sentences shorter than 'min_chars' are
+    joined with the following one, to avoid synthesizing tiny audio segments.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ''
+
+    def feed(self, text: str) -> list:
+        """
+        Adds a piece of text and returns the sentences it completed, in order.
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in BOUNDARY.finditer(self._buffer):
+            end = match.end()
+            candidate = self._buffer[start:end].strip()
+
+            if match.group().startswith('.') and not match.group().startswith('...'):
+                words = candidate[:-1].split()
+                if words and words[-1].lower() in ABBREVIATIONS:
+                    continue
+
+            if len(candidate) < self.min_chars:
+                continue
+
+            sentences.append(candidate)
+            start = end
+
+        self._buffer = self._buffer[start:]
+
+        return sentences
+
+    def flush(self) -> list:
+        """
+        Returns the text left in the buffer as a last sentence, if any.
+        """
+        rest, self._buffer = self._buffer.strip(), ''
+
+        return [rest] if rest else []
+
+
+def speak_while_generating(tokens, synthesize, executor, min_chars: int = 20):
+    """
+    Synthesizes the sentences of a streamed answer while the rest is still generated.
+
+    Every sentence is submitted to 'executor' as soon as it is complete, so speech
+    synthesis overlaps with generation and the first audio is ready after about one
+    sentence plus one short synthesis. Audio segments are emitted strictly in order,
+    as soon as all the previous ones are ready.
+
+    Args:
+        tokens (iterable): The pieces of the answer, in order.
+        synthesize (callable): Function turning a sentence into an audio URL.
+        executor (Executor): Where the syntheses run; its size bounds their concurrency.
+        min_chars (int): Minimum length of a sentence, see 'SentenceSplitter'.
+
+    Yields:
+        tuple: ('token', str) for every piece of text, as it arrives, and
+        ('audio', dict) with the 'index', 'text' and 'mp3' of every segment ('mp3' is
+        None, with an 'error', when the synthesis failed).
+    """
+    splitter = SentenceSplitter(min_chars)
+    pending = deque()
+    index = 0
+
+    def submit(sentences):
+        nonlocal index
+        for sentence in sentences:
+            pending.append((index, sentence, executor.submit(synthesize, sentence)))
+            index += 1
+
+    def ready(wait: bool):
+        while pending and (wait or pending[0][2].done()):
+            position, sentence, future = pending.popleft()
+            segment = {'index': position, 'text': sentence}
+            try:
+                segment['mp3'] = future.result()
+            except Exception as e:
+                # a failed segment is skipped, the text keeps streaming
+                segment.update(mp3=None, error=str(e))
+            yield 'audio', segment
+
+    try:
+        for token in tokens:
+            yield 'token', token
+            submit(splitter.feed(token))
+            yield from ready(wait=False)
+
+        submit(splitter.flush())
+        yield from ready(wait=True)
+    finally:
+        # the client went away: drop the syntheses that did not start yet
+        for _, _, future in pending:
+            future.cancel()
@@ -0,0 +1,92 @@
+import unittest
+from datetime import date
+from intent import Intent, parse_date_range, parse_intent
+
+TODAY = date(2026, 10, 14)
+PRACTICES = ['technology', 'design']
+JOB_TITLES = ['designer', 'front-end developer']
+EMPLOYEE_NAMES = ['mario rossi', 'anna bianchi']
+
+
+def parse(prompt: str):
+    return parse_intent(prompt, TODAY, PRACTICES, JOB_TITLES, EMPLOYEE_NAMES)
+
+
+class ParseIntentTest(unittest.TestCase):
+    def assertIntent(self, prompt: str, expected: Intent):
+        intent = parse(prompt)
+        self.assertIsNotNone(intent, prompt)
+        self.assertEqual(repr(intent), repr(expected))
+
+    def test_understood_questions(self):
+        self.assertIntent('quali designer sono liberi dal 4 al 10 luglio 2027?',
+                          Intent('job_title', 'designer', '2027-07-04', '2027-07-10'))
+        self.assertIntent('Mario Rossi è disponibile il 20 ottobre?',
+                          Intent('employee', 'mario rossi', '2026-10-20', '2026-10-20'))
+        self.assertIntent("chi c'è libero in technology questo mese?",
+                          Intent('practice', 'technology', '2026-10-01', '2026-10-31'))
+
+    def test_busy_and_negated_questions_fall_back(self):
+        for prompt in ('quali designer sono occupati a luglio?',
+                       'chi è allocato in technology la prossima settimana?',
+                       'Mario Rossi non è libero il 12 novembre?',
+                       'nessun designer è disponibile a novembre?'):
+            self.assertIsNone(parse(prompt), prompt)
+
+    def test_unsupported_qualifiers_fall_back(self):
+        for prompt in ('designer liberi nella seconda metà di luglio',
+                       'designer liberi a luglio dell anno scorso',
+                       'designer liberi dopo il 10 luglio',
+                       'designer liberi fino al 10 novembre',
+                       'designer liberi a fine novembre'):
+            self.assertIsNone(parse(prompt), prompt)
+
+    def test_amount_constraints_fall_back(self):
+        for prompt in ("chi c'è libero in technology per 3 giorni a novembre?",
+                       "chi c'è libero in technology almeno al 50% a novembre?",
+                       'designer liberi per più di una settimana a novembre'):
+            self.assertIsNone(parse(prompt), prompt)
+
+    def test_several_date_expressions_fall_back(self):
+        for prompt in ("chi c'è libero in technology da oggi a venerdì?",
+                       "chi c'è libero in technology da novembre a dicembre?",
+                       'designer liberi domani a novembre',
+                       "designer liberi dall'8 novembre al 12"):
+            self.assertIsNone(parse(prompt), prompt)
+
+    def test_several_groups_fall_back(self):
+        for prompt in ('designer e sviluppatori liberi a novembre',
+                       'designer o front-end developer disponibili a novembre',
+                       'designer liberi oggi e domani'):
+            self.assertIsNone(parse(prompt), prompt)
+
+    def test_past_year_less_ranges_roll_to_next_year(self):
+        self.assertIntent('designer liberi dal 28 dicembre al 3 gennaio',
+                          Intent('job_title', 'designer', '2026-12-28', '2027-01-03'))
+        self.assertIntent('designer liberi dal 4 al 10 luglio',
+                          Intent('job_title', 'designer', '2027-07-04', '2027-07-10'))
+        self.assertIntent('designer liberi il 12 febbraio',
+                          Intent('job_title', 'designer', '2027-02-12', '2027-02-12'))
+        self.assertIntent('designer liberi a luglio',
+                          Intent('job_title', 'designer', '2027-07-01', '2027-07-31'))
+
+
+class ParseDateRangeTest(unittest.TestCase):
+    def test_current_month_is_not_rolled(self):
+        self.assertEqual(parse_date_range('a ottobre', TODAY), (date(2026, 10, 1), date(2026, 10, 31)))
+
+    def test_explicit_years_are_kept(self):
+        self.assertEqual(parse_date_range('dal 4 al 10 luglio 2024', TODAY), (date(2024, 7, 4), date(2024, 7, 10)))
+        self.assertEqual(parse_date_range('dal 4/7/2024 al 10/7/2024', TODAY), (date(2024, 7, 4), date(2024, 7, 10)))
+        self.assertEqual(parse_date_range('a luglio 2024', TODAY), (date(2024, 7, 1), date(2024, 7, 31)))
+
+    def test_single_expression_with_its_year(self):
+        self.assertEqual(parse_date_range('nel mese di luglio del 2027', TODAY), (date(2027, 7, 1), date(2027, 7, 31)))
+        self.assertEqual(parse_date_range('la prossima settimana', TODAY), (date(2026, 10, 19), date(2026, 10, 23)))
+
+    def test_numeric_ranges_roll(self):
+        self.assertEqual(parse_date_range('dal 4/7 al 10/7', TODAY), (date(2027, 7, 4), date(2027, 7, 10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from per_process import per_process
+
+
+class PerProcessTest(unittest.TestCase):
+
+    def test_one_instance_per_process(self):
+        created = []
+
+        @per_process
+        def get_client():
+            """The client."""
+            created.append(os.getpid())
+            return object()
+
+        with ThreadPoolExecutor(8) as executor:
+            clients = set(map(id, executor.map(lambda _: get_client(), range(100))))
+
+        self.assertEqual(len(clients), 1)
+        self.assertEqual(created, [os.getpid()])
+        self.assertEqual(get_client.__doc__, 'The client.')
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # the child gets its own instance
+            os.write(write, b'1' if id(get_client()) not in clients and len(created) == 2 else b'0')
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read, 1), b'1')
+        os.close(read)
+        os.close(write)
+
+
+if __name__ == '__main__':
+    unittest.main()
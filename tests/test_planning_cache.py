@@ -0,0 +1,105 @@
+import random
+import unittest
+from datetime import date, timedelta
+from planning_cache import PlanningCache
+
+
+def fake_planningboard(from_date: str, to_date: str) -> dict:
+    # a deterministic planning: every employee has a slot on some of the days, not on all
+    plannings = {}
+    current, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+    while current <= end:
+        for employee_id in ('1', '2', '3'):
+            if (current.toordinal() + int(employee_id)) % 3:
+                plannings.setdefault(employee_id, []).append(
+                    {'date': f'{current.isoformat()}T00:00:00', 'hours': current.toordinal() % 8})
+        current += timedelta(days=1)
+    return {'data': {'plannings': plannings}}
+
+
+class RecordingFetch:
+
+    def __init__(self, fetch=fake_planningboard):
+        self.fetch = fetch
+        self.calls = []
+
+    def __call__(self, from_date: str, to_date: str) -> dict:
+        self.calls.append((from_date, to_date))
+        return self.fetch(from_date, to_date)
+
+
+class PlanningCacheTest(unittest.TestCase):
+
+    def assertMatchesDirectFetch(self, window: str):
+        rng = random.Random(window)
+        fetch = RecordingFetch()
+        cache = PlanningCache(fetch, window=window, ttl=3600, maxsize=1024)
+        first = date(2024, 1, 1)
+
+        for _ in range(500):
+            from_date = first + timedelta(days=rng.randint(0, 700))
+            to_date = from_date + timedelta(days=rng.randint(-3, 90))
+            with self.subTest(window=window, from_date=from_date, to_date=to_date):
+                expected = fake_planningboard(from_date.isoformat(), to_date.isoformat())
+                self.assertEqual(cache.get(from_date.isoformat(), to_date.isoformat()), expected)
+
+        # every fetch covers whole aligned windows
+        for from_date, to_date in fetch.calls:
+            start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+            if window == 'week':
+                self.assertEqual((start.weekday(), end.weekday()), (0, 6))
+            else:
+                self.assertEqual(start.day, 1)
+                self.assertEqual((end + timedelta(days=1)).day, 1)
+
+    def test_week_windows_match_direct_fetch(self):
+        self.assertMatchesDirectFetch('week')
+
+    def test_month_windows_match_direct_fetch(self):
+        self.assertMatchesDirectFetch('month')
+
+    def test_contiguous_missing_windows_are_fetched_once(self):
+        fetch = RecordingFetch()
+        cache = PlanningCache(fetch, window='week')
+
+        cache.get('2024-07-03', '2024-07-04')
+        cache.get('2024-07-24', '2024-07-25')
+        cache.get('2024-07-01', '2024-08-11')
+
+        self.assertEqual(fetch.calls, [
+            ('2024-07-01', '2024-07-07'),
+            ('2024-07-22', '2024-07-28'),
+            # the two missing runs around the cached week of the 22nd
+            ('2024-07-08', '2024-07-21'),
+            ('2024-07-29', '2024-08-11'),
+        ])
+
+    def test_dateless_response_switches_to_passthrough(self):
+        def dateless(from_date: str, to_date: str) -> dict:
+            return {'data': {'plannings': {'1': [{'hours': 8, 'range': [from_date, to_date]}]}}}
+
+        fetch = RecordingFetch(dateless)
+        cache = PlanningCache(fetch, window='week')
+
+        for _ in range(2):
+            self.assertEqual(cache.get('2024-07-03', '2024-07-04'), dateless('2024-07-03', '2024-07-04'))
+        cache.prefetch('2024-07-10', '2024-07-12')
+
+        # one aligned fetch to find out, then the exact ranges; prefetching does nothing
+        self.assertEqual(fetch.calls, [
+            ('2024-07-01', '2024-07-07'),
+            ('2024-07-03', '2024-07-04'),
+            ('2024-07-03', '2024-07-04'),
+        ])
+        self.assertTrue(cache.stats()['passthrough_mode'])
+
+    def test_inverted_range_is_empty(self):
+        fetch = RecordingFetch()
+        cache = PlanningCache(fetch)
+
+        self.assertEqual(cache.get('2024-07-10', '2024-07-04'), {'data': {'plannings': {}}})
+        self.assertEqual(fetch.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from sessions import SessionStore
+
+
+def turn(content: str) -> list:
+    return [{'role': 'user', 'content': content}, {'role': 'assistant', 'content': content.upper()}]
+
+
+class SharedSessionStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        # two stores on the same folder, as two gunicorn workers
+        self.workers = [SessionStore(max_turns=3, folder=folder.name) for _ in range(2)]
+
+    def test_every_worker_sees_the_whole_history(self):
+        session_id = self.workers[0].get().id
+
+        for number in range(5):
+            session = self.workers[number % 2].get(session_id)
+            self.assertEqual(session.id, session_id)
+            expected = [turn(f'turn {n}') for n in range(max(0, number - 3), number)]
+            self.assertEqual(session.history(), [message for messages in expected for message in messages])
+            session.add_turn(turn(f'turn {number}'))
+
+    def test_unknown_or_malformed_ids(self):
+        self.assertEqual(self.workers[1].get('ab' * 16).id, 'ab' * 16)
+        self.assertEqual(len(self.workers[1].get('ab' * 16)), 0)
+        self.assertNotEqual(self.workers[1].get('../etc/passwd').id, '../etc/passwd')
+
+
+class LocalSessionStoreTest(unittest.TestCase):
+
+    def test_keeps_the_client_id(self):
+        store = SessionStore()
+        session = store.get('cd' * 16)
+        session.add_turn(turn('ciao'))
+
+        self.assertIs(store.get('cd' * 16), session)
+        self.assertIsNone(session.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import random
+import unittest
+from datetime import date, timedelta
+from workcalendar import WorkCalendar, count_weekdays
+
+
+def loop_weekdays(from_date: date, to_date: date) -> int:
+    # the day-by-day loop 'count_weekdays()' replaced
+    total = 0
+    current = from_date
+    while current <= to_date:
+        if current.weekday() < 5:
+            total += 1
+        current += timedelta(days=1)
+    return total
+
+
+def loop_hours(calendar: WorkCalendar, from_date: date, to_date: date) -> int:
+    total = 0
+    current = from_date
+    while current <= to_date:
+        if calendar.is_working_day(current):
+            total += calendar.hours_per_day
+        current += timedelta(days=1)
+    return total
+
+
+def random_ranges(rng: random.Random, first: date, last: date, count: int):
+    span = (last - first).days
+    for _ in range(count):
+        from_date = first + timedelta(days=rng.randint(0, span))
+        # negative lengths give inverted ranges
+        yield from_date, from_date + timedelta(days=rng.randint(-10, 120))
+
+
+class CountWeekdaysTest(unittest.TestCase):
+
+    def test_matches_day_by_day_loop(self):
+        rng = random.Random(7)
+        for from_date, to_date in random_ranges(rng, date(2020, 1, 1), date(2030, 12, 31), 5000):
+            with self.subTest(from_date=from_date, to_date=to_date):
+                self.assertEqual(count_weekdays(from_date, to_date), loop_weekdays(from_date, to_date))
+
+    def test_inverted_range_is_empty(self):
+        self.assertEqual(count_weekdays(date(2024, 7, 10), date(2024, 7, 4)), 0)
+
+
+class WorkCalendarTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = WorkCalendar(2023, 2026, closures=[date(2024, 8, 14)],
+                                     recurring_closures=[(12, 24), (12, 31)])
+
+    def test_hours_match_day_by_day_loop(self):
+        rng = random.Random(11)
+        # the ranges start before and end after the horizon, to cover the closed form too
+        for from_date, to_date in random_ranges(rng, date(2021, 6, 1), date(2028, 6, 30), 3000):
+            with self.subTest(from_date=from_date, to_date=to_date):
+                self.assertEqual(self.calendar.hours(from_date, to_date),
+                                 loop_hours(self.calendar, from_date, to_date))
+
+    def test_holidays_are_not_working_days(self):
+        # Lunedì dell'Angelo, a one-off closure and a recurring closure
+        self.assertEqual(self.calendar.hours(date(2024, 4, 1), date(2024, 4, 1)), 0)
+        self.assertEqual(self.calendar.hours(date(2024, 8, 14), date(2024, 8, 14)), 0)
+        self.assertEqual(self.calendar.hours(date(2025, 12, 24), date(2025, 12, 24)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
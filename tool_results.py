@@ -0,0 +1,61 @@
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding('o200k_base')
+except Exception:
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text with 'tiktoken' when it is installed, otherwise
+    estimates them as one token every 4 characters.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+
+    return (len(text) + 3) // 4
+
+
+def encode_verbose(availabilities: list) -> str:
+    """
+    Encodes availabilities one verbose 'Allocation' line per employee.
+    """
+    return "\n".join(availability.toString() for availability in availabilities)
+
+
+def encode_compact(availabilities: list, top_n: int = 20) -> str:
+    """
+    Encodes availabilities as a compact table for the LLM.
+
+    The table has a header followed by CSV-like rows sorted by decreasing
+    availability; only the first 'top_n' employees are listed, the others are
+    summarized with aggregate counts, e.g.:
+
+        name,free%,occupied%
+        Antonio Ruccia,100,0
+        Anna Bianchi,70,30
+        +12 more: 5 fully free, 3 partially free, 4 fully occupied
+
+    Args:
+        availabilities (list): The 'Availability' results of a tool call.
+        top_n (int): Maximum number of rows.
+
+    Returns:
+        str: The encoded tool result.
+    """
+    if not availabilities:
+        return 'no employees found'
+
+    ranked = sorted(availabilities, key=lambda a: a.amount_free, reverse=True)
+    rows = ['name,free%,occupied%']
+    rows += [f'{a.name},{a.amount_free},{a.amount_occupied}' for a in ranked[:top_n]]
+
+    rest = ranked[top_n:]
+    if rest:
+        fully_free = sum(1 for a in rest if a.amount_free >= 100)
+        fully_occupied = sum(1 for a in rest if a.amount_free <= 0)
+        partially_free = len(rest) - fully_free - fully_occupied
+        rows.append(f'+{len(rest)} more: {fully_free} fully free, '
+                    f'{partially_free} partially free, {fully_occupied} fully occupied')
+
+    return "\n".join(rows)
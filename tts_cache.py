@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from audio import MODEL, elevenlabs_async, elevenlalbs, voice_id
+from audio_store import AudioStore
+from singleflight import SingleFlight
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized answers.
+
+    Every MP3 is stored once in an 'AudioStore', named after the SHA-256 of the
+    voice, the model and the text, so an answer that was already spoken is served
+    without calling ElevenLabs again. Size and age limits, eviction and the files
+    written by other worker processes are handled by the store.
+    """
+
+    def __init__(self, store: AudioStore):
+        self.store = store
+        # downloads in progress and texts waiting to be streamed live in the store's scratch subfolder
+        self.tmp_folder = store.tmp_folder
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._tasks = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256('|'.join([voice_id(), MODEL, text]).encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return self.store.path(f'{key}.mp3')
+
+    def lookup(self, text: str) -> str:
+        """
+        Returns the path of the cached MP3 of 'text', or None if it is not in the store.
+        """
+        return self.lookup_key(self.key(text))
+
+    def lookup_key(self, key: str, count: bool = True) -> str:
+        """
+        Same as 'lookup()', given the key of the text.
+
+        Args:
+            key (str): The key of the text.
+            count (bool): Whether the lookup counts as a cache hit or miss; status
+                checks, e.g. polling a TTS job, pass False.
+        """
+        found = self.store.use(f'{key}.mp3')
+
+        if count:
+            with self._lock:
+                if found:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+
+        return self.path(key) if found else None
+
+    def remember(self, text: str) -> str:
+        """
+        Saves 'text' next to the downloads under its key, so a later request (possibly
+        served by another worker) can synthesize it given the key alone.
+
+        Returns:
+            str: The key of the text.
+        """
+        key = self.key(text)
+        path = f'{self.tmp_folder}/{key}.txt'
+        part = f'{path}.{uuid.uuid4().hex}.part'
+
+        Path(self.tmp_folder).mkdir(parents=True, exist_ok=True)
+        with open(part, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(part, path)
+
+        return key
+
+    def recall(self, key: str) -> str:
+        """
+        Returns the text saved by 'remember()' under 'key', or None if it is unknown.
+        """
+        try:
+            with open(f'{self.tmp_folder}/{key}.txt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def add(self, path: str):
+        """
+        Stores an MP3 already written at 'path(key)', e.g. by a streaming download.
+        """
+        self.store.add(path)
+
+    def synthesize(self, text: str) -> str:
+        """
+        Returns the path of the MP3 of 'text', synthesizing it only on a cache miss.
+
+        Concurrent misses for the same text share one synthesis.
+        """
+        return self.lookup(text) or self._flight.do(self.key(text), self._synthesize, text)
+
+    async def synthesize_async(self, text: str) -> str:
+        """
+        Async variant of 'synthesize()', to be awaited on the 'aio' event loop.
+        """
+        path = await asyncio.to_thread(self.lookup, text)
+        if path:
+            return path
+
+        key = self.key(text)
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize_async(text))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total, 4) if total else 0,
+            }
+
+    def _synthesize(self, text: str) -> str:
+        return self._store(text, elevenlalbs(text, self.tmp_folder))
+
+    async def _synthesize_async(self, text: str) -> str:
+        speech_file_path = await elevenlabs_async(text, self.tmp_folder)
+        return await asyncio.to_thread(self._store, text, speech_file_path)
+
+    def _store(self, text: str, speech_file_path: str) -> str:
+        path = self.path(self.key(text))
+        os.replace(speech_file_path, path)
+        self.store.add(path)
+
+        return path
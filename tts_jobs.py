@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class TTSJob:
+    def __init__(self, job_id: str, text: str):
+        self.id = job_id
+        self.text = text
+        self.status = 'pending'
+        self.mp3 = None
+        self.error = None
+        self.created_at = time.monotonic()
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'mp3': self.mp3,
+            'error': self.error,
+        }
+
+
+class TTSJobs:
+    """
+    Background text-to-speech jobs, so an answer can be returned before its audio is ready.
+
+    Jobs run on a small thread pool that bounds the concurrent syntheses; the
+    others wait in its queue. Submitting the id of a job that is pending, running
+    or done returns that job instead of starting a new one. Finished jobs are
+    kept for 'ttl' seconds and at most 'max_jobs' jobs are tracked, the oldest
+    being forgotten first.
+
+    Jobs run in the process that submitted them. With a 'folder' shared by the
+    workers, every change of status is also written there, so 'shared()' tells
+    the other workers whether a job is pending, running or failed.
+    """
+
+    def __init__(self, synthesize, workers: int = 2, ttl: float = 600, max_jobs: int = 1000,
+                 folder: str = None):
+        """
+        Args:
+            synthesize (callable): Function turning a text into an audio URL.
+            workers (int): Maximum number of concurrent syntheses.
+            ttl (float): Seconds a job is kept after its creation.
+            max_jobs (int): Maximum number of jobs tracked.
+            folder (str, optional): Folder shared by the workers for the job statuses.
+        """
+        self._synthesize = synthesize
+        self.workers = workers
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.folder = folder
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._failed = 0
+
+    def submit(self, job_id: str, text: str) -> TTSJob:
+        """
+        Queues the synthesis of 'text' as job 'job_id', unless that job already exists
+        and did not fail.
+
+        Returns:
+            TTSJob: The job.
+        """
+        with self._lock:
+            self._expire()
+
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != 'failed':
+                return job
+
+            job = TTSJob(job_id, text)
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._submitted += 1
+
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+        self._record(job)
+        self._executor.submit(self._run, job)
+
+        return job
+
+    def get(self, job_id: str) -> TTSJob:
+        """
+        Returns the job with the given id, or None if it is unknown or expired.
+        """
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def shared(self, job_id: str) -> dict:
+        """
+        Returns the status of a job as last recorded by any worker, or None if no
+        worker recorded it in the last 'ttl' seconds.
+        """
+        if not self.folder:
+            return None
+
+        path = self._path(job_id)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'workers': self.workers,
+                'jobs': len(statuses),
+                'pending': statuses.count('pending'),
+                'running': statuses.count('running'),
+                'submitted': self._submitted,
+                'failed': self._failed,
+            }
+
+    def _run(self, job: TTSJob):
+        job.status = 'running'
+        self._record(job)
+        try:
+            job.mp3 = self._synthesize(job.text)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+            with self._lock:
+                self._failed += 1
+        finally:
+            self._record(job)
+            job.done.set()
+
+    def _path(self, job_id: str) -> str:
+        return f'{self.folder}/{job_id}.job'
+
+    def _record(self, job: TTSJob):
+        if not self.folder:
+            return
+
+        path = self._path(job.id)
+        part = f'{path}.{uuid.uuid4().hex}.part'
+        try:
+            Path(self.folder).mkdir(parents=True, exist_ok=True)
+            with open(part, 'w', encoding='utf-8') as f:
+                json.dump(job.to_dict(), f)
+            os.replace(part, path)
+        except OSError:
+            pass
+
+    def _expire(self):
+        # jobs are kept in creation order, so the expired ones are at the front;
+        # unfinished jobs are never forgotten while they are waiting or running
+        now = time.monotonic()
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if now - job.created_at < self.ttl or not job.done.is_set():
+                break
+            self._jobs.popitem(last=False)
@@ -0,0 +1,151 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from per_process import per_process
+
+
+def get_headers() -> dict:
+    """
+    Fetches HTTP headers from environment variables.
+
+    This function constructs a dictionary of HTTP headers with values retrieved from environment variables.
+    The headers included are:
+    - "Cookie": Value obtained from the 'COOKIE' environment variable.
+    - "Accept": A static value set to "application/json, text/javascript, */*; q=0.01".
+    - "Referer": Value obtained from the 'REFERER' environment variable.
+    - "Origin": Value obtained from the 'ORIGIN' environment variable.
+
+    Returns:
+        dict: A dictionary containing the HTTP headers.
+    """
+    return {
+        "Cookie": os.environ.get('COOKIE'),
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "Referer": os.environ.get('REFERER'),
+        "Origin": os.environ.get('ORIGIN')
+    }
+
+
+class UpstreamClient:
+    """
+    Pooled, keep-alive HTTP client for the planningboard API.
+
+    A single 'requests.Session' is shared by every caller in the process, so
+    connections to 'BASE_URL' are reused instead of paying a new TCP+TLS
+    handshake per request. Every request gets explicit connect/read timeouts
+    and idempotent GETs are retried with backoff on connection errors and 5xx
+    responses, within a bounded retry budget.
+    """
+
+    def __init__(self, base_url: str, headers: dict, connect_timeout: float = 3.05,
+                 read_timeout: float = 30, retries: int = 2, backoff: float = 0.3,
+                 pool_size: int = 10):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def get_json(self, path: str, params: dict = None) -> dict:
+        """
+        Performs a GET request against the upstream API and returns the parsed JSON body.
+
+        Args:
+            path (str): The path relative to the base URL, e.g. '/planningboard/'.
+            params (dict, optional): Query string parameters.
+
+        Returns:
+            dict: The JSON response parsed as a dictionary.
+
+        Raises:
+            requests.exceptions.HTTPError: If the upstream answers with a non-200 status.
+        """
+        with self._lock:
+            self._requests += 1
+
+        try:
+            response = self.session.get(
+                ''.join([self.base_url, path]), params=params, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self._count_error()
+            raise
+
+        if response.status_code == 200:
+            return response.json()
+
+        self._count_error()
+        raise requests.exceptions.HTTPError(
+            f'{response.status_code} from {path}', response=response)
+
+    def _count_error(self):
+        with self._lock:
+            self._errors += 1
+
+    def stats(self) -> dict:
+        """
+        Returns request counters and connection pool statistics.
+
+        Returns:
+            dict: Request/error counters plus, for each host pool, the number of
+            idle keep-alive connections and the total connections opened so far.
+        """
+        pools = {}
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f'{key.key_scheme}://{key.key_host}:{key.key_port}'] = {
+                'idle': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0,
+                'opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'maxsize': self.pool_size,
+            }
+
+        return {
+            'requests': self._requests,
+            'errors': self._errors,
+            'pools': pools,
+        }
+
+
+@per_process
+def get_upstream_client() -> UpstreamClient:
+    """
+    Returns the per-process upstream client, creating it on first use.
+
+    The client is rebuilt when the current PID differs from the one that
+    created it, so sockets are never shared between forked gunicorn workers.
+
+    Returns:
+        UpstreamClient: The shared client for this process.
+    """
+    return UpstreamClient(
+        base_url=os.environ.get('BASE_URL'),
+        headers=get_headers(),
+        connect_timeout=float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT') or 3.05),
+        read_timeout=float(os.environ.get('UPSTREAM_READ_TIMEOUT') or 30),
+        retries=int(os.environ.get('UPSTREAM_RETRIES') or 2),
+        pool_size=int(os.environ.get('UPSTREAM_POOL_SIZE') or 10),
+    )
@@ -0,0 +1,183 @@
+from datetime import date, timedelta
+
+
+def count_weekdays(from_date: date, to_date: date) -> int:
+    """
+    Counts the weekdays (Monday to Friday) between two dates, inclusive of boundaries.
+
+    The count is computed in constant time: every full week contributes 5 weekdays
+    and only the remaining 0 to 6 days are inspected one by one.
+
+    Args:
+        from_date (date): The start date.
+        to_date (date): The end date.
+
+    Returns:
+        int: The number of weekdays in the range, 0 if 'from_date' is greater than 'to_date'.
+    """
+    days = (to_date - from_date).days + 1
+
+    if days <= 0:
+        return 0
+
+    full_weeks, remainder = divmod(days, 7)
+    first_weekday = from_date.weekday()
+    extra = sum(1 for offset in range(remainder) if (first_weekday + offset) % 7 < 5)
+
+    return full_weeks * 5 + extra
+
+
+def easter_sunday(year: int) -> date:
+    """
+    Returns the date of Easter Sunday in the Gregorian calendar (anonymous algorithm).
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+
+    return date(year, month, day + 1)
+
+
+def italian_holidays(year: int) -> set:
+    """
+    Returns the Italian national public holidays of the given year.
+    """
+    return {
+        date(year, 1, 1),    # Capodanno
+        date(year, 1, 6),    # Epifania
+        easter_sunday(year) + timedelta(days=1),  # Lunedì dell'Angelo
+        date(year, 4, 25),   # Festa della Liberazione
+        date(year, 5, 1),    # Festa del Lavoro
+        date(year, 6, 2),    # Festa della Repubblica
+        date(year, 8, 15),   # Ferragosto
+        date(year, 11, 1),   # Ognissanti
+        date(year, 12, 8),   # Immacolata Concezione
+        date(year, 12, 25),  # Natale
+        date(year, 12, 26),  # Santo Stefano
+    }
+
+
+def parse_closures(value: str) -> tuple:
+    """
+    Parses a comma separated list of closures.
+
+    Entries in 'YYYY-MM-DD' format are one-off closures, entries in 'MM-DD' format
+    recur every year, e.g. "12-24, 12-31, 2024-08-14".
+
+    Args:
+        value (str): The comma separated closures, possibly empty.
+
+    Returns:
+        tuple: (list of one-off dates, list of (month, day) recurring closures).
+    """
+    closures = []
+    recurring = []
+
+    for entry in (value or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if entry.count('-') == 2:
+            closures.append(date.fromisoformat(entry))
+        else:
+            month, day = entry.split('-')
+            recurring.append((int(month), int(day)))
+
+    return closures, recurring
+
+
+class WorkCalendar:
+    """
+    Working-hours calendar aware of public holidays and company closures.
+
+    A cumulative array of working hours is precomputed for every day of a
+    multi-year horizon, so the capacity of any range inside the horizon is the
+    difference of two array lookups. Ranges falling outside the horizon are
+    computed in closed form from the weekday count minus the holidays they contain.
+    """
+
+    def __init__(self, first_year: int, last_year: int, closures: list = (),
+                 recurring_closures: list = (), italian: bool = True, hours_per_day: int = 8):
+        """
+        Args:
+            first_year (int): First year of the precomputed horizon.
+            last_year (int): Last year of the precomputed horizon.
+            closures (list): One-off non-working dates (e.g. company closures).
+            recurring_closures (list): (month, day) tuples closed every year (e.g. a patron saint).
+            italian (bool): Whether Italian national public holidays are non-working days.
+            hours_per_day (int): Working hours of a working day.
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self.closures = set(closures)
+        self.recurring_closures = set(recurring_closures)
+        self.italian = italian
+        self.hours_per_day = hours_per_day
+
+        self.origin = date(first_year, 1, 1)
+        self.end = date(last_year, 12, 31)
+
+        holidays = set()
+        for year in range(first_year, last_year + 1):
+            holidays |= self.holidays(year)
+
+        # cumulative[i] is the number of working hours in [origin, origin + i days)
+        days = (self.end - self.origin).days + 1
+        self.cumulative = [0] * (days + 1)
+        current = self.origin
+        for i in range(days):
+            working = current.weekday() < 5 and current not in holidays
+            self.cumulative[i + 1] = self.cumulative[i] + (hours_per_day if working else 0)
+            current += timedelta(days=1)
+
+    def holidays(self, year: int) -> set:
+        """
+        Returns every non-working date of the given year, weekends excluded.
+        """
+        holidays = italian_holidays(year) if self.italian else set()
+        holidays |= {closure for closure in self.closures if closure.year == year}
+
+        for month, day in self.recurring_closures:
+            try:
+                holidays.add(date(year, month, day))
+            except ValueError:
+                pass
+
+        return holidays
+
+    def is_working_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays(day.year)
+
+    def hours(self, from_date: date, to_date: date) -> int:
+        """
+        Returns the working hours between two dates, inclusive of boundaries.
+
+        Args:
+            from_date (date): The start date.
+            to_date (date): The end date.
+
+        Returns:
+            int: The working hours in the range, 0 if 'from_date' is greater than 'to_date'.
+        """
+        if from_date > to_date:
+            return 0
+
+        if self.origin <= from_date and to_date <= self.end:
+            start = (from_date - self.origin).days
+            stop = (to_date - self.origin).days + 1
+            return self.cumulative[stop] - self.cumulative[start]
+
+        working_days = count_weekdays(from_date, to_date)
+        for year in range(from_date.year, to_date.year + 1):
+            working_days -= sum(
+                1 for holiday in self.holidays(year)
+                if from_date <= holiday <= to_date and holiday.weekday() < 5)
+
+        return working_days * self.hours_per_day